@@ -3,6 +3,10 @@ from .users import router as users_router
 from .clients import router as clients_router
 from .invoices import router as invoices_router
 from .payments import router as payments_router
+from .search import router as search_router
+from .tasks import router as tasks_router
+from .recurring_invoices import router as recurring_invoices_router
+from .reports import router as reports_router
 
 __all__ = [
     "auth_router",
@@ -10,4 +14,8 @@ __all__ = [
     "clients_router",
     "invoices_router",
     "payments_router",
+    "search_router",
+    "tasks_router",
+    "recurring_invoices_router",
+    "reports_router",
 ]
@@ -7,7 +7,7 @@ from api.deps import get_db, get_current_active_user
 from models import User
 from schemas import UserCreate, UserResponse
 from schemas.auth import Token
-from core import verify_password, get_password_hash, create_access_token
+from core import verify_password_async, get_password_hash_async, create_access_token
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -35,7 +35,7 @@ async def register(
         email=user_in.email,
         username=user_in.username,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password)
+        hashed_password=await get_password_hash_async(user_in.password)
     )
     db.add(user)
     await db.commit()
@@ -56,7 +56,7 @@ async def login(
     user = result.scalar_one_or_none()
     
     # Verify user and password
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
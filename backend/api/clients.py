@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import date, datetime
 
-from api.deps import get_db, get_current_active_user
+from api.deps import get_db, get_current_active_user, get_cursor_position
 from models import Client, User
-from schemas import ClientCreate, ClientUpdate, ClientResponse
+from schemas import ClientCreate, ClientUpdate, ClientResponse, ClientImportResponse
+from core import paginate, next_cursor, weak_etag, etag_matches, not_modified
+from core.pagination import CursorPosition
+from services import stream_client_statement, import_clients, ClientImportFileError
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
@@ -24,27 +29,69 @@ async def create_client(
     return client
 
 
+@router.post("/import", response_model=ClientImportResponse)
+async def import_clients_csv(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create or update clients from a CSV upload, matching existing clients by email.
+
+    Columns are named after the client fields; `name` and `email` are required.
+    Invalid rows are skipped and listed in `errors` with their line number.
+    """
+    try:
+        return await import_clients(db, current_user.id, file.file)
+    except ClientImportFileError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+
 @router.get("/", response_model=List[ClientResponse])
 async def list_clients(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    position: Optional[CursorPosition] = Depends(get_cursor_position),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all clients for the current user."""
-    query = select(Client).where(Client.user_id == current_user.id).offset(skip).limit(limit)
+    """
+    List all clients for the current user.
+
+    Pass the `X-Next-Cursor` header of a page back as `cursor` to fetch the next one.
+    The page carries an ETag; send it back in `If-None-Match` to get a 304 while
+    the page is unchanged.
+    """
+    query = select(Client).where(Client.user_id == current_user.id)
+    query = paginate(query, Client, position, skip, limit)
     
     result = await db.execute(query)
     clients = result.scalars().all()
+    
+    cursor = next_cursor(clients, limit)
+    headers = {"X-Next-Cursor": cursor} if cursor else {}
+    etag = weak_etag(version for client in clients for version in (client.id, client.updated_at))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, headers)
+    
+    response.headers.update(headers)
+    response.headers["ETag"] = etag
     return clients
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
 async def get_client(
     client_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific client by ID."""
+    """Get a specific client by ID; answers 304 when `If-None-Match` holds its current ETag."""
     result = await db.execute(select(Client).where(Client.id == client_id))
     client = result.scalar_one_or_none()
     if not client:
@@ -52,9 +99,49 @@ async def get_client(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Client not found"
         )
+    
+    etag = weak_etag((client.id, client.updated_at))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return client
 
 
+@router.get("/{client_id}/statement")
+async def get_client_statement(
+    client_id: int,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream a client's statement for a period (both ends inclusive and optional).
+
+    The JSON document holds the balance per currency carried into the period,
+    the invoices (positive amounts) and payments (negative amounts) in date
+    order with a running balance per currency, and the closing balances.
+    """
+    result = await db.execute(
+        select(Client.id).where(Client.id == client_id, Client.user_id == current_user.id)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    if start and end and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'"
+        )
+    
+    return StreamingResponse(
+        stream_client_statement(client_id, start, end),
+        media_type="application/json",
+    )
+
+
 @router.put("/{client_id}", response_model=ClientResponse)
 async def update_client(
     client_id: int,
@@ -73,6 +160,7 @@ async def update_client(
     update_data = client_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(client, field, value)
+    client.updated_at = datetime.utcnow()
     
     db.add(client)
     await db.commit()
@@ -1,14 +1,22 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from database import get_session
 from models import User
-from core import verify_token
+from core import verify_token, decode_cursor, create_cache, settings
+from core.pagination import CursorPosition
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Snapshots of authenticated users by id, invalidated by the users endpoints
+user_cache = create_cache(
+    "users",
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -40,12 +48,18 @@ async def get_current_user(
     except (ValueError, TypeError):
         raise credentials_exception
     
+    snapshot = await user_cache.get(user_id)
+    if snapshot is not None:
+        # The password hash is never cached
+        return User.model_validate({**snapshot, "hashed_password": ""})
+    
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     
     if user is None:
         raise credentials_exception
     
+    await user_cache.set(user_id, user.model_dump(mode="json", exclude={"hashed_password"}))
     return user
 
 
@@ -61,3 +75,18 @@ async def get_current_active_user(
             detail="Inactive user"
         )
     return current_user
+
+
+def get_cursor_position(cursor: Optional[str] = None) -> Optional[CursorPosition]:
+    """
+    Decode the optional `cursor` query parameter used for keyset pagination.
+    """
+    if cursor is None:
+        return None
+    position = decode_cursor(cursor)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return position
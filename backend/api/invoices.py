@@ -1,29 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import AsyncIterator, List, Optional
+from datetime import date, datetime
 from decimal import Decimal
-from datetime import datetime
+import csv
+import io
+import zipfile
 
 from api.deps import get_db, get_current_active_user
-from models import Invoice, InvoiceItem, Client, User
-from schemas import InvoiceCreate, InvoiceUpdate, InvoiceResponse
+from database import get_session
+from services import (
+    invoice_number_allocator,
+    summary_key,
+    new_deltas,
+    add_invoice,
+    apply_summary_deltas,
+    get_user_summary,
+    invalidate_aging_reports,
+    build_invoice,
+    render_invoice_html,
+    get_invoice_pdf,
+    get_invoice_pdfs,
+    send_invoice_email,
+)
+from models import Invoice, InvoiceItem, InvoiceStatus, Client, User
+from schemas import (
+    InvoiceCreate,
+    InvoiceUpdate,
+    InvoiceResponse,
+    InvoiceItemResponse,
+    InvoiceBulkResult,
+    InvoiceBulkResponse,
+    InvoiceSummaryResponse,
+    TaskResponse,
+)
+from core import paginate, next_cursor, decode_cursor, weak_etag, etag_matches, not_modified, FastJSONResponse
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
+# Upper bound on invoices accepted by a single bulk create request
+BULK_MAX_INVOICES = 1000
 
-def generate_invoice_number() -> str:
-    """Generate a unique invoice number."""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"INV-{timestamp}"
+# Upper bound on invoices rendered by a single batch PDF request
+PDF_BATCH_MAX_INVOICES = 200
 
+# Invoices fetched per server-side cursor batch during export
+EXPORT_BATCH_SIZE = 500
 
-def calculate_invoice_totals(invoice: Invoice, items: List[InvoiceItem]) -> None:
-    """Calculate invoice totals based on items."""
-    subtotal = sum(item.amount for item in items)
-    invoice.subtotal = subtotal
-    invoice.tax_amount = subtotal * (invoice.tax_rate / Decimal("100"))
-    invoice.total = subtotal + invoice.tax_amount - invoice.discount_amount
+# Sortable list_invoices fields and the types their cursor values decode to
+LIST_SORT_FIELDS = {
+    "created_at": datetime,
+    "issue_date": date,
+    "due_date": date,
+    "total": Decimal,
+}
+LIST_SORT_PATTERN = "^-?(" + "|".join(LIST_SORT_FIELDS) + ")$"
+
+# Fields of InvoiceResponse / InvoiceItemResponse, in schema order, and the
+# columns list_invoices projects them from
+LIST_INVOICE_FIELDS = [name for name in InvoiceResponse.model_fields if name != "items"]
+LIST_ITEM_FIELDS = list(InvoiceItemResponse.model_fields)
+LIST_INVOICE_COLUMNS = [getattr(Invoice, name) for name in LIST_INVOICE_FIELDS]
+LIST_ITEM_COLUMNS = [getattr(InvoiceItem, name) for name in LIST_ITEM_FIELDS]
+
+EXPORT_CSV_COLUMNS = [
+    "invoice_id", "invoice_number", "client_id", "status", "issue_date", "due_date",
+    "currency", "subtotal", "tax_rate", "tax_amount", "discount_amount", "total", "notes", "terms",
+    "created_at", "updated_at",
+    "item_id", "item_description", "item_quantity", "item_unit_price", "item_amount",
+]
 
 
 @router.post("/", response_model=InvoiceResponse, status_code=status.HTTP_201_CREATED)
@@ -35,7 +84,7 @@ async def create_invoice(
     """Create a new invoice with items."""
     # Verify client exists and belongs to user
     result = await db.execute(
-        select(Client).where(
+        select(Client.id).where(
             Client.id == invoice_in.client_id,
             Client.user_id == current_user.id
         )
@@ -46,104 +95,373 @@ async def create_invoice(
             detail="Client not found"
         )
     
-    # Create invoice
-    invoice = Invoice(
-        user_id=current_user.id,
-        client_id=invoice_in.client_id,
-        invoice_number=generate_invoice_number(),
-        due_date=invoice_in.due_date,
-        tax_rate=invoice_in.tax_rate,
-        discount_amount=invoice_in.discount_amount,
-        notes=invoice_in.notes,
-        terms=invoice_in.terms
-    )
-    
-    # Create invoice items
-    items = []
-    for item_in in invoice_in.items:
-        amount = item_in.quantity * item_in.unit_price
-        item = InvoiceItem(
-            description=item_in.description,
-            quantity=item_in.quantity,
-            unit_price=item_in.unit_price,
-            amount=amount
-        )
-        items.append(item)
-    
-    # Calculate totals
-    calculate_invoice_totals(invoice, items)
+    (invoice_number,) = await invoice_number_allocator.allocate(current_user.id)
+    invoice = build_invoice(invoice_in, current_user.id, invoice_number)
     
-    # Save to database
+    # Invoice and items are flushed together; the session keeps them loaded
+    # after commit (expire_on_commit=False), so no re-select is needed
     db.add(invoice)
+    deltas = new_deltas()
+    add_invoice(deltas, summary_key(invoice), invoice.total, Decimal("0.00"))
+    await apply_summary_deltas(db, deltas)
     await db.commit()
-    await db.refresh(invoice)
-    
-    # Add items with invoice_id
-    for item in items:
-        item.invoice_id = invoice.id
-        db.add(item)
     
-    await db.commit()
+    return InvoiceResponse.model_validate(invoice)
+
+
+@router.post("/bulk", response_model=InvoiceBulkResponse)
+async def create_invoices_bulk(
+    invoices_in: List[InvoiceCreate],
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many invoices in one transaction.
+
+    Client ownership is checked with a single query, then invoices and items are
+    written with multi-row INSERTs. Rows referencing an unknown client are
+    reported as failed; the rest are created.
+    """
+    if len(invoices_in) > BULK_MAX_INVOICES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_MAX_INVOICES} invoices can be created per request"
+        )
     
-    # Fetch complete invoice with items
+    client_ids = {invoice_in.client_id for invoice_in in invoices_in}
     result = await db.execute(
-        select(Invoice).where(Invoice.id == invoice.id)
+        select(Client.id).where(
+            Client.id.in_(client_ids),
+            Client.user_id == current_user.id
+        )
     )
-    invoice = result.scalar_one()
+    owned_client_ids = set(result.scalars().all())
     
-    # Fetch items
-    items_result = await db.execute(
-        select(InvoiceItem).where(InvoiceItem.invoice_id == invoice.id)
-    )
-    invoice_items = items_result.scalars().all()
+    results = []
+    accepted = []
+    for index, invoice_in in enumerate(invoices_in):
+        if invoice_in.client_id not in owned_client_ids:
+            results.append(InvoiceBulkResult(index=index, error="Client not found"))
+        else:
+            accepted.append((index, invoice_in))
     
-    # Create response
-    response = InvoiceResponse.model_validate(invoice)
-    response.items = [InvoiceItemResponse.model_validate(item) for item in invoice_items]
+    invoice_numbers = await invoice_number_allocator.allocate(current_user.id, count=len(accepted))
+    invoices = [
+        (index, build_invoice(invoice_in, current_user.id, invoice_number))
+        for (index, invoice_in), invoice_number in zip(accepted, invoice_numbers)
+    ]
     
-    return response
+    if invoices:
+        invoice_rows = [invoice.model_dump(exclude={"id"}) for _, invoice in invoices]
+        inserted = await db.execute(
+            insert(Invoice).returning(
+                Invoice.id, Invoice.invoice_number, sort_by_parameter_order=True
+            ),
+            invoice_rows
+        )
+        
+        item_rows = []
+        deltas = new_deltas()
+        for (index, invoice), (invoice_id, invoice_number) in zip(invoices, inserted.all()):
+            add_invoice(deltas, summary_key(invoice), invoice.total, Decimal("0.00"))
+            results.append(InvoiceBulkResult(
+                index=index, invoice_id=invoice_id, invoice_number=invoice_number
+            ))
+            for item in invoice.items:
+                item_rows.append({**item.model_dump(exclude={"id"}), "invoice_id": invoice_id})
+        
+        if item_rows:
+            await db.execute(insert(InvoiceItem), item_rows)
+        await apply_summary_deltas(db, deltas)
+        await db.commit()
+    
+    results.sort(key=lambda row: row.index)
+    return InvoiceBulkResponse(
+        created=len(invoices),
+        failed=len(invoices_in) - len(invoices),
+        results=results
+    )
+
+
+def _invoice_versions(invoice, items):
+    """ETag inputs of an invoice and its items (ORM objects or projected rows)."""
+    yield invoice.id
+    yield invoice.updated_at
+    for item in items:
+        yield item.id
+        yield item.updated_at
 
 
 @router.get("/", response_model=List[InvoiceResponse])
 async def list_invoices(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    status_filter: Optional[InvoiceStatus] = Query(None, alias="status"),
+    client_id: Optional[int] = None,
+    issue_date_from: Optional[date] = None,
+    issue_date_to: Optional[date] = None,
+    due_date_from: Optional[date] = None,
+    due_date_to: Optional[date] = None,
+    min_total: Optional[Decimal] = None,
+    max_total: Optional[Decimal] = None,
+    sort: str = Query("created_at", pattern=LIST_SORT_PATTERN),
+    list_format: str = Query("objects", alias="format", pattern="^(objects|rows)$"),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all invoices for the current user."""
-    from sqlalchemy.orm import selectinload
+    """
+    List invoices for the current user, optionally filtered and sorted.
+
+    Date and total ranges are inclusive. `sort` is one of created_at,
+    issue_date, due_date or total, prefixed with `-` for descending order.
+    Pass the `X-Next-Cursor` header of a page back as `cursor`, with the same
+    filters and sort, to fetch the next one. The page carries an ETag; send it
+    back in `If-None-Match` to get a 304 while the page is unchanged.
+
+    With `format=rows` the page is returned column-projected, which is much
+    smaller for large pages: `{"columns": [...], "item_columns": [...],
+    "rows": [[...values, [[...item values], ...]], ...]}`.
+    """
+    descending = sort.startswith("-")
+    sort_field = sort.lstrip("-")
+    sort_column = getattr(Invoice, sort_field)
     
-    # Use selectinload to eagerly load items and avoid N+1 queries
-    query = (
-        select(Invoice)
-        .where(Invoice.user_id == current_user.id)
-        .options(selectinload(Invoice.items))
-        .offset(skip)
-        .limit(limit)
+    position = None
+    if cursor is not None:
+        position = decode_cursor(cursor, LIST_SORT_FIELDS[sort_field])
+        if position is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    
+    # Plain column rows: no ORM objects are built and nothing is validated
+    # twice; the response schema's fields are read straight off the rows
+    query = select(*LIST_INVOICE_COLUMNS).where(Invoice.user_id == current_user.id)
+    if status_filter is not None:
+        query = query.where(Invoice.status == status_filter)
+    if client_id is not None:
+        query = query.where(Invoice.client_id == client_id)
+    if issue_date_from is not None:
+        query = query.where(Invoice.issue_date >= issue_date_from)
+    if issue_date_to is not None:
+        query = query.where(Invoice.issue_date <= issue_date_to)
+    if due_date_from is not None:
+        query = query.where(Invoice.due_date >= due_date_from)
+    if due_date_to is not None:
+        query = query.where(Invoice.due_date <= due_date_to)
+    if min_total is not None:
+        query = query.where(Invoice.total >= min_total)
+    if max_total is not None:
+        query = query.where(Invoice.total <= max_total)
+    query = paginate(query, Invoice, position, skip, limit, sort_column, descending)
+    
+    invoices = (await db.execute(query)).all()
+    
+    items_by_invoice = {invoice.id: [] for invoice in invoices}
+    if invoices:
+        items = await db.execute(
+            select(*LIST_ITEM_COLUMNS)
+            .where(InvoiceItem.invoice_id.in_(items_by_invoice))
+            .order_by(InvoiceItem.invoice_id, InvoiceItem.id)
+        )
+        for item in items.all():
+            items_by_invoice[item.invoice_id].append(item)
+    
+    next_page = next_cursor(invoices, limit, sort_field)
+    headers = {"X-Next-Cursor": next_page} if next_page else {}
+    etag = weak_etag(
+        version
+        for invoice in invoices
+        for version in _invoice_versions(invoice, items_by_invoice[invoice.id])
     )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, headers)
+    headers["ETag"] = etag
+    
+    if list_format == "rows":
+        content = {
+            "columns": LIST_INVOICE_FIELDS + ["items"],
+            "item_columns": LIST_ITEM_FIELDS,
+            "rows": [
+                [*invoice, [list(item) for item in items_by_invoice[invoice.id]]]
+                for invoice in invoices
+            ],
+        }
+    else:
+        content = [
+            {
+                **invoice._asdict(),
+                "items": [item._asdict() for item in items_by_invoice[invoice.id]],
+            }
+            for invoice in invoices
+        ]
+    return FastJSONResponse(content, headers=headers)
+
+
+@router.get("/summary", response_model=InvoiceSummaryResponse)
+async def get_invoice_summary(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Dashboard totals in the base currency, overall and by status, month, client and currency."""
+    return await get_user_summary(db, current_user.id)
+
+
+async def _export_batches(user_id: int) -> AsyncIterator[List[InvoiceResponse]]:
+    """
+    Yield the user's invoices, with items, in bounded batches.
+
+    Invoices come from a server-side cursor and each batch's items are fetched
+    with a single IN query, so only one batch is ever held in memory (the
+    session's identity map is weak-referencing, so exported rows are released).
+    """
+    async for session in get_session():
+        query = (
+            select(Invoice)
+            .where(Invoice.user_id == user_id)
+            .order_by(Invoice.created_at, Invoice.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        result = await session.stream(query)
+        async for invoices in result.scalars().partitions():
+            items_result = await session.execute(
+                select(InvoiceItem)
+                .where(InvoiceItem.invoice_id.in_([invoice.id for invoice in invoices]))
+                .order_by(InvoiceItem.invoice_id, InvoiceItem.id)
+            )
+            items_by_invoice = {}
+            for item in items_result.scalars():
+                items_by_invoice.setdefault(item.invoice_id, []).append(
+                    InvoiceItemResponse.model_validate(item)
+                )
+            
+            yield [
+                InvoiceResponse.model_validate(
+                    {**invoice.model_dump(), "items": items_by_invoice.get(invoice.id, [])}
+                )
+                for invoice in invoices
+            ]
+
+
+async def _export_ndjson(user_id: int) -> AsyncIterator[str]:
+    """Render the export as one JSON invoice (with nested items) per line."""
+    async for batch in _export_batches(user_id):
+        yield "".join(invoice.model_dump_json() + "\n" for invoice in batch)
+
+
+async def _export_csv(user_id: int) -> AsyncIterator[str]:
+    """Render the export as CSV with one row per invoice item."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
     
-    result = await db.execute(query)
-    invoices = result.unique().scalars().all()
+    async for batch in _export_batches(user_id):
+        for invoice in batch:
+            invoice_columns = [
+                invoice.id, invoice.invoice_number, invoice.client_id, invoice.status.value,
+                invoice.issue_date, invoice.due_date, invoice.currency, invoice.subtotal, invoice.tax_rate,
+                invoice.tax_amount, invoice.discount_amount, invoice.total, invoice.notes,
+                invoice.terms, invoice.created_at.isoformat(), invoice.updated_at.isoformat(),
+            ]
+            # Invoices without items still get a row so totals are never lost
+            for item in invoice.items or [None]:
+                item_columns = (
+                    [item.id, item.description, item.quantity, item.unit_price, item.amount]
+                    if item else [None] * 5
+                )
+                writer.writerow(invoice_columns + item_columns)
+        
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    
+    # Header only, when there were no invoices at all
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_invoices(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream every invoice of the current user, with items, as NDJSON or CSV."""
+    if export_format == "csv":
+        content, media_type = _export_csv(current_user.id), "text/csv"
+    else:
+        content, media_type = _export_ndjson(current_user.id), "application/x-ndjson"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="invoices.{export_format}"'},
+    )
+
+
+async def _render_documents(db: AsyncSession, invoices: List[Invoice], user: User) -> List[str]:
+    """Render the HTML of invoices whose items are loaded, fetching their clients in one query."""
+    client_ids = {invoice.client_id for invoice in invoices}
+    result = await db.execute(select(Client).where(Client.id.in_(client_ids)))
+    clients = {client.id: client for client in result.scalars().all()}
+    return [
+        render_invoice_html(invoice, invoice.items, clients[invoice.client_id], user)
+        for invoice in invoices
+    ]
+
+
+@router.post("/pdf")
+async def export_invoice_pdfs(
+    invoice_ids: List[int],
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Render several invoices as PDFs in parallel and return them as a ZIP archive.
+
+    Unknown ids and invoices of other users are skipped.
+    """
+    if len(invoice_ids) > PDF_BATCH_MAX_INVOICES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {PDF_BATCH_MAX_INVOICES} invoices can be rendered per request"
+        )
     
-    # Convert to response models
-    response_list = []
-    for invoice in invoices:
-        invoice_response = InvoiceResponse.model_validate(invoice)
-        if hasattr(invoice, 'items'):
-            invoice_response.items = [InvoiceItemResponse.model_validate(item) for item in invoice.items]
-        response_list.append(invoice_response)
+    result = await db.execute(
+        select(Invoice)
+        .where(Invoice.id.in_(invoice_ids), Invoice.user_id == current_user.id)
+        .options(selectinload(Invoice.items))
+        .order_by(Invoice.id)
+    )
+    invoices = result.scalars().all()
+    paths = await get_invoice_pdfs(await _render_documents(db, invoices, current_user))
     
-    return response_list
+    # PDFs are already compressed, so the archive only stores them
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zf:
+        for invoice, path in zip(invoices, paths):
+            zf.write(path, f"{invoice.invoice_number}.pdf")
+    return Response(
+        content=archive.getvalue(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="invoices.zip"'},
+    )
 
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
 async def get_invoice(
     invoice_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific invoice by ID."""
-    result = await db.execute(select(Invoice).where(Invoice.id == invoice_id))
+    """Get a specific invoice by ID; answers 304 when `If-None-Match` holds its current ETag."""
+    result = await db.execute(
+        select(Invoice).where(Invoice.id == invoice_id).options(selectinload(Invoice.items))
+    )
     invoice = result.scalar_one_or_none()
     if not invoice:
         raise HTTPException(
@@ -151,16 +469,56 @@ async def get_invoice(
             detail="Invoice not found"
         )
     
-    # Fetch items
-    items_result = await db.execute(
-        select(InvoiceItem).where(InvoiceItem.invoice_id == invoice.id)
+    # Checked before serializing, so a 304 skips model_validate entirely
+    etag = weak_etag(_invoice_versions(invoice, invoice.items))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return InvoiceResponse.model_validate(invoice)
+
+
+@router.get("/{invoice_id}/pdf")
+async def get_invoice_pdf_file(
+    invoice_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download an invoice as PDF, served from the render cache when unchanged."""
+    result = await db.execute(
+        select(Invoice)
+        .where(Invoice.id == invoice_id, Invoice.user_id == current_user.id)
+        .options(selectinload(Invoice.items))
     )
-    items = items_result.scalars().all()
+    invoice = result.scalar_one_or_none()
+    if not invoice:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invoice not found"
+        )
     
-    invoice_response = InvoiceResponse.model_validate(invoice)
-    invoice_response.items = [InvoiceItemResponse.model_validate(item) for item in items]
+    [html] = await _render_documents(db, [invoice], current_user)
+    path = await get_invoice_pdf(html)
+    return FileResponse(path, media_type="application/pdf", filename=f"{invoice.invoice_number}.pdf")
+
+
+@router.post("/{invoice_id}/send", response_model=TaskResponse, status_code=status.HTTP_202_ACCEPTED)
+async def send_invoice(
+    invoice_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue the invoice to be emailed to its client with the PDF attached."""
+    result = await db.execute(
+        select(Invoice.id).where(Invoice.id == invoice_id, Invoice.user_id == current_user.id)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invoice not found"
+        )
     
-    return invoice_response
+    task = await send_invoice_email.delay(invoice_id)
+    return TaskResponse(task_id=task.id, status="queued")
 
 
 @router.put("/{invoice_id}", response_model=InvoiceResponse)
@@ -170,7 +528,9 @@ async def update_invoice(
     db: AsyncSession = Depends(get_db)
 ):
     """Update an invoice."""
-    result = await db.execute(select(Invoice).where(Invoice.id == invoice_id))
+    result = await db.execute(
+        select(Invoice).where(Invoice.id == invoice_id).options(selectinload(Invoice.items))
+    )
     invoice = result.scalar_one_or_none()
     if not invoice:
         raise HTTPException(
@@ -178,24 +538,27 @@ async def update_invoice(
             detail="Invoice not found"
         )
     
+    old_key, old_total = summary_key(invoice), invoice.total
+    
     update_data = invoice_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(invoice, field, value)
+    invoice.updated_at = datetime.utcnow()
+    
+    new_key = summary_key(invoice)
+    if new_key != old_key or invoice.total != old_total:
+        deltas = new_deltas()
+        add_invoice(deltas, old_key, old_total, invoice.amount_paid, sign=-1)
+        add_invoice(deltas, new_key, invoice.total, invoice.amount_paid)
+        await apply_summary_deltas(db, deltas)
     
     db.add(invoice)
     await db.commit()
-    await db.refresh(invoice)
+    if "due_date" in update_data:
+        await invalidate_aging_reports([invoice.user_id])
     
-    # Fetch items
-    items_result = await db.execute(
-        select(InvoiceItem).where(InvoiceItem.invoice_id == invoice.id)
-    )
-    items = items_result.scalars().all()
-    
-    invoice_response = InvoiceResponse.model_validate(invoice)
-    invoice_response.items = [InvoiceItemResponse.model_validate(item) for item in items]
-    
-    return invoice_response
+    # Items were eagerly loaded and are kept after commit (expire_on_commit=False)
+    return InvoiceResponse.model_validate(invoice)
 
 
 @router.delete("/{invoice_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -220,9 +583,9 @@ async def delete_invoice(
     for item in items:
         await db.delete(item)
     
+    deltas = new_deltas()
+    add_invoice(deltas, summary_key(invoice), invoice.total, invoice.amount_paid, sign=-1)
+    await apply_summary_deltas(db, deltas)
+    
     await db.delete(invoice)
     await db.commit()
-
-
-# Import here to avoid circular dependency
-from schemas import InvoiceItemResponse
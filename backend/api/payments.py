@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import List, Optional
 
-from api.deps import get_db
-from models import Payment, Invoice
+from api.deps import get_db, get_cursor_position
+from models import Invoice, Payment
 from schemas import PaymentCreate, PaymentUpdate, PaymentResponse
+from core import paginate, next_cursor
+from core.pagination import CursorPosition
+from services import apply_payment_change
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
@@ -15,16 +18,30 @@ async def create_payment(
     payment_in: PaymentCreate,
     db: AsyncSession = Depends(get_db)
 ):
-    """Create a new payment."""
-    # Verify invoice exists
-    result = await db.execute(select(Invoice).where(Invoice.id == payment_in.invoice_id))
-    if not result.scalar_one_or_none():
+    """Create a new payment and apply it to the invoice balance."""
+    # Validate against the invoice before any balance changes
+    currency = (await db.execute(
+        select(Invoice.currency).where(Invoice.id == payment_in.invoice_id)
+    )).scalar_one_or_none()
+    if currency is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invoice not found"
         )
+    if payment_in.currency and payment_in.currency != currency:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Payment currency must match the invoice currency ({currency})"
+        )
     
-    payment = Payment(**payment_in.model_dump())
+    invoice = await apply_payment_change(db, payment_in.invoice_id, payment_in.amount)
+    if not invoice:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invoice not found"
+        )
+    
+    payment = Payment(**payment_in.model_dump(exclude={"currency"}), currency=invoice.currency)
     db.add(payment)
     await db.commit()
     await db.refresh(payment)
@@ -33,18 +50,29 @@ async def create_payment(
 
 @router.get("/", response_model=List[PaymentResponse])
 async def list_payments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     invoice_id: int = None,
+    position: Optional[CursorPosition] = Depends(get_cursor_position),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all payments."""
-    query = select(Payment).offset(skip).limit(limit)
+    """
+    List all payments.
+
+    Pass the `X-Next-Cursor` header of a page back as `cursor` to fetch the next one.
+    """
+    query = select(Payment)
     if invoice_id:
         query = query.where(Payment.invoice_id == invoice_id)
+    query = paginate(query, Payment, position, skip, limit)
     
     result = await db.execute(query)
     payments = result.scalars().all()
+    
+    cursor = next_cursor(payments, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
     return payments
 
 
@@ -70,7 +98,7 @@ async def update_payment(
     payment_in: PaymentUpdate,
     db: AsyncSession = Depends(get_db)
 ):
-    """Update a payment."""
+    """Update a payment, adjusting the invoice balance if the amount changed."""
     result = await db.execute(select(Payment).where(Payment.id == payment_id))
     payment = result.scalar_one_or_none()
     if not payment:
@@ -79,10 +107,14 @@ async def update_payment(
             detail="Payment not found"
         )
     
+    old_amount = payment.amount
     update_data = payment_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(payment, field, value)
     
+    if payment.amount != old_amount:
+        await apply_payment_change(db, payment.invoice_id, payment.amount - old_amount)
+    
     db.add(payment)
     await db.commit()
     await db.refresh(payment)
@@ -94,7 +126,7 @@ async def delete_payment(
     payment_id: int,
     db: AsyncSession = Depends(get_db)
 ):
-    """Delete a payment."""
+    """Delete a payment and reverse it on the invoice balance."""
     result = await db.execute(select(Payment).where(Payment.id == payment_id))
     payment = result.scalar_one_or_none()
     if not payment:
@@ -103,5 +135,7 @@ async def delete_payment(
             detail="Payment not found"
         )
     
+    await apply_payment_change(db, payment.invoice_id, -payment.amount)
+    
     await db.delete(payment)
     await db.commit()
@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+
+from api.deps import get_db, get_current_active_user, get_cursor_position
+from models import Client, RecurringInvoice, RecurringInvoiceItem, User
+from schemas import RecurringInvoiceCreate, RecurringInvoiceUpdate, RecurringInvoiceResponse
+from core import paginate, next_cursor, settings
+from core.pagination import CursorPosition
+
+router = APIRouter(prefix="/recurring-invoices", tags=["recurring invoices"])
+
+
+async def _get_template(db: AsyncSession, template_id: int, user_id: int) -> RecurringInvoice:
+    result = await db.execute(
+        select(RecurringInvoice)
+        .where(RecurringInvoice.id == template_id, RecurringInvoice.user_id == user_id)
+        .options(selectinload(RecurringInvoice.items))
+    )
+    template = result.scalar_one_or_none()
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recurring invoice not found"
+        )
+    return template
+
+
+@router.post("/", response_model=RecurringInvoiceResponse, status_code=status.HTTP_201_CREATED)
+async def create_recurring_invoice(
+    template_in: RecurringInvoiceCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a recurring invoice template.
+
+    The first invoice is issued on `start_date`, then every `interval_count`
+    intervals until `end_date`, by the recurring invoice generator.
+    """
+    result = await db.execute(
+        select(Client.id).where(
+            Client.id == template_in.client_id,
+            Client.user_id == current_user.id
+        )
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    
+    template = RecurringInvoice(
+        **template_in.model_dump(exclude={"items", "currency"}),
+        currency=template_in.currency or settings.BASE_CURRENCY,
+        user_id=current_user.id,
+        next_run=template_in.start_date,
+    )
+    template.items = [RecurringInvoiceItem(**item_in.model_dump()) for item_in in template_in.items]
+    db.add(template)
+    await db.commit()
+    
+    return RecurringInvoiceResponse.model_validate(template)
+
+
+@router.get("/", response_model=List[RecurringInvoiceResponse])
+async def list_recurring_invoices(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    position: Optional[CursorPosition] = Depends(get_cursor_position),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List the current user's recurring invoice templates.
+
+    Pass the `X-Next-Cursor` header of a page back as `cursor` to fetch the next one.
+    """
+    query = (
+        select(RecurringInvoice)
+        .where(RecurringInvoice.user_id == current_user.id)
+        .options(selectinload(RecurringInvoice.items))
+    )
+    query = paginate(query, RecurringInvoice, position, skip, limit)
+    
+    result = await db.execute(query)
+    templates = result.scalars().all()
+    
+    cursor = next_cursor(templates, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return [RecurringInvoiceResponse.model_validate(template) for template in templates]
+
+
+@router.get("/{template_id}", response_model=RecurringInvoiceResponse)
+async def get_recurring_invoice(
+    template_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a recurring invoice template by ID."""
+    template = await _get_template(db, template_id, current_user.id)
+    return RecurringInvoiceResponse.model_validate(template)
+
+
+@router.put("/{template_id}", response_model=RecurringInvoiceResponse)
+async def update_recurring_invoice(
+    template_id: int,
+    template_in: RecurringInvoiceUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update a recurring invoice template; changes apply to invoices not generated yet."""
+    template = await _get_template(db, template_id, current_user.id)
+    
+    update_data = template_in.model_dump(exclude_unset=True)
+    end_date = update_data.get("end_date")
+    if end_date is not None and end_date < template.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    for field, value in update_data.items():
+        setattr(template, field, value)
+    template.updated_at = datetime.utcnow()
+    
+    db.add(template)
+    await db.commit()
+    return RecurringInvoiceResponse.model_validate(template)
+
+
+@router.delete("/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_recurring_invoice(
+    template_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a recurring invoice template; invoices already generated are kept."""
+    template = await _get_template(db, template_id, current_user.id)
+    await db.delete(template)
+    await db.commit()
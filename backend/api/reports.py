@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from api.deps import get_db, get_current_active_user
+from models import User
+from schemas import AgingReportResponse
+from services import get_aging_report
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get("/aging", response_model=AgingReportResponse)
+async def aging_report(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Accounts-receivable aging report.
+
+    Unpaid balances of sent and overdue invoices, bucketed by days past due
+    (not yet due, 0-30, 31-60, 61-90, over 90) per client, in the base currency.
+    """
+    return await get_aging_report(db, current_user.id)
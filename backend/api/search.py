@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List
+
+from api.deps import get_db, get_current_active_user
+from models import User
+from schemas import SearchResult
+from services import search as search_service
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search clients (name, email, tax ID) and invoices (number, notes, item descriptions)."""
+    return await search_service(db, current_user.id, q, limit, offset)
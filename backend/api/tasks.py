@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from api.deps import get_current_active_user
+from models import User
+from schemas import TaskResponse
+from services import task_queue
+from services.task_queue import AsyncResult
+
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task_status(
+    task_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the status of a background task: queued, running, succeeded or failed."""
+    task_status = await AsyncResult(task_id, task_queue.broker).get_status()
+    if task_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    return TaskResponse(task_id=task_id, status=task_status)
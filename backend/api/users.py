@@ -3,10 +3,10 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 
-from api.deps import get_db, get_current_active_user
+from api.deps import get_db, get_current_active_user, user_cache
 from models import User
 from schemas import UserUpdate, UserResponse
-from core import get_password_hash
+from core import get_password_hash_async
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -57,7 +57,7 @@ async def update_user(
     
     update_data = user_in.model_dump(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
     
     for field, value in update_data.items():
         setattr(user, field, value)
@@ -65,6 +65,7 @@ async def update_user(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    await user_cache.delete(user_id)
     return user
 
 
@@ -84,3 +85,4 @@ async def delete_user(
     
     await db.delete(user)
     await db.commit()
+    await user_cache.delete(user_id)
@@ -2,16 +2,36 @@ from .config import settings
 from .security import (
     verify_password,
     get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_hash_stats,
     create_access_token,
     verify_token,
 )
 from .logging import get_logger
+from .cache import create_cache, cache_stats
+from .pagination import encode_cursor, decode_cursor, paginate, next_cursor
+from .etag import weak_etag, etag_matches, not_modified
+from .serialization import FastJSONResponse
 
 __all__ = [
     "settings",
     "verify_password",
     "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
+    "password_hash_stats",
     "create_access_token",
     "verify_token",
     "get_logger",
+    "create_cache",
+    "cache_stats",
+    "encode_cursor",
+    "decode_cursor",
+    "paginate",
+    "next_cursor",
+    "weak_etag",
+    "etag_matches",
+    "not_modified",
+    "FastJSONResponse",
 ]
@@ -0,0 +1,126 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from core.config import settings
+
+# All caches created through create_cache, by name, for stats reporting
+_caches: Dict[str, "Cache"] = {}
+
+
+class Cache:
+    """
+    Base class for async key/value caches of JSON-serializable values.
+
+    Subclasses implement _get/_set/_delete; hit and miss counters are kept
+    per process regardless of the backend.
+    """
+
+    def __init__(self, name: str, ttl: int):
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: Any) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        value = await self._get(str(key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: Any, value: Any) -> None:
+        """Store a value for the configured TTL."""
+        await self._set(str(key), value)
+
+    async def delete(self, key: Any) -> None:
+        """Invalidate a key."""
+        await self._delete(str(key))
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def _set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    async def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(Cache):
+    """In-process TTL + LRU cache, for single-node deployments."""
+
+    def __init__(self, name: str, ttl: int, max_size: int):
+        super().__init__(name, ttl)
+        self.max_size = max_size
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def _get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def _set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class RedisCache(Cache):
+    """Redis-backed cache shared by every node of a fleet."""
+
+    def __init__(self, name: str, ttl: int, url: str):
+        super().__init__(name, ttl)
+        # Optional dependency, only needed when CACHE_BACKEND=redis
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    def _key(self, key: str) -> str:
+        return f"cache:{self.name}:{key}"
+
+    async def _get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    async def _set(self, key: str, value: Any) -> None:
+        await self._redis.set(self._key(key), json.dumps(value), ex=self.ttl)
+
+    async def _delete(self, key: str) -> None:
+        await self._redis.delete(self._key(key))
+
+
+def create_cache(name: str, ttl: int, max_size: int) -> Cache:
+    """Create a named cache using the backend selected by CACHE_BACKEND."""
+    if settings.CACHE_BACKEND == "redis":
+        cache = RedisCache(name, ttl, settings.REDIS_URL)
+    else:
+        cache = MemoryCache(name, ttl, max_size)
+    _caches[name] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, dict]:
+    """Hit/miss counters of every cache created through create_cache."""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -9,10 +9,25 @@ class Settings:
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG else "INFO").upper()
+    # "text" or "json"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+    # Hand records to a background listener thread instead of writing inline
+    LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    
     # JWT Settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-production-minimum-32-chars")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "43200"))  # 30 days
+    # "jose" (python-jose) or "pyjwt" (faster, needs the PyJWT package)
+    JWT_BACKEND: str = os.getenv("JWT_BACKEND", "jose")
+    # Verified tokens kept in memory; 0 disables the cache
+    JWT_CACHE_MAX_SIZE: int = int(os.getenv("JWT_CACHE_MAX_SIZE", "10000"))
+    
+    # Password hashing pool
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", "16"))
     
     # App Settings
     PROJECT_NAME: str = os.getenv("API_TITLE", "Invoicing SaaS API")
@@ -24,6 +39,78 @@ class Settings:
     DB_USER: str = os.getenv("DB_USER", "postgres")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "password")
     DB_NAME: str = os.getenv("DB_NAME", "invoicing_db")
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+    
+    # Caching
+    # "memory" keeps caches in-process; "redis" shares them across nodes
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+    AGING_CACHE_TTL_SECONDS: int = int(os.getenv("AGING_CACHE_TTL_SECONDS", "300"))
+    AGING_CACHE_MAX_SIZE: int = int(os.getenv("AGING_CACHE_MAX_SIZE", "10000"))
+    
+    # Invoice numbering
+    INVOICE_NUMBER_FORMAT: str = os.getenv("INVOICE_NUMBER_FORMAT", "{series}-{user_id}-{number:06d}")
+    INVOICE_NUMBER_SERIES: str = os.getenv("INVOICE_NUMBER_SERIES", "INV")
+    INVOICE_NUMBER_BLOCK_SIZE: int = int(os.getenv("INVOICE_NUMBER_BLOCK_SIZE", "50"))
+    
+    # Overdue sweeper
+    # Run the sweeper inside each API process; disable when using the standalone worker
+    OVERDUE_SWEEP_IN_PROCESS: bool = os.getenv("OVERDUE_SWEEP_IN_PROCESS", "true").lower() == "true"
+    OVERDUE_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("OVERDUE_SWEEP_INTERVAL_SECONDS", "3600"))
+    OVERDUE_SWEEP_BATCH_SIZE: int = int(os.getenv("OVERDUE_SWEEP_BATCH_SIZE", "1000"))
+    
+    # Currencies
+    # Reporting currency; exchange rates are stored as units of it per unit of a currency
+    BASE_CURRENCY: str = os.getenv("BASE_CURRENCY", "USD")
+    # CSV of date,currency,rate loaded at startup (a local stand-in for a rates feed)
+    EXCHANGE_RATES_FILE: str = os.getenv("EXCHANGE_RATES_FILE", "")
+    EXCHANGE_RATES_TTL_SECONDS: int = int(os.getenv("EXCHANGE_RATES_TTL_SECONDS", "300"))
+    
+    # Recurring invoices
+    # Run the generator inside each API process; disable when using the standalone worker
+    RECURRING_IN_PROCESS: bool = os.getenv("RECURRING_IN_PROCESS", "true").lower() == "true"
+    RECURRING_INTERVAL_SECONDS: float = float(os.getenv("RECURRING_INTERVAL_SECONDS", "3600"))
+    RECURRING_BATCH_SIZE: int = int(os.getenv("RECURRING_BATCH_SIZE", "1000"))
+    RECURRING_TIME_BUDGET_SECONDS: float = float(os.getenv("RECURRING_TIME_BUDGET_SECONDS", "600"))
+    
+    # Metrics
+    # Shared directory for per-worker snapshots when running several workers
+    METRICS_MULTIPROC_DIR: str = os.getenv("METRICS_MULTIPROC_DIR", "")
+    # Identifies one server run in that directory; derived from the master process when empty
+    METRICS_RUN_ID: str = os.getenv("METRICS_RUN_ID", "")
+    METRICS_FLUSH_INTERVAL: float = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+    
+    # PDF rendering
+    # Rendered PDFs, stored under a hash of their HTML and the template version
+    PDF_CACHE_DIR: str = os.getenv("PDF_CACHE_DIR", "pdf_cache")
+    PDF_RENDER_WORKERS: int = int(os.getenv("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+    
+    # Background tasks
+    # "database" queues jobs in the app database; "redis" uses REDIS_URL
+    TASK_BROKER: str = os.getenv("TASK_BROKER", "database")
+    # Run a worker inside each API process; disable when using the standalone worker
+    TASK_WORKER_IN_PROCESS: bool = os.getenv("TASK_WORKER_IN_PROCESS", "true").lower() == "true"
+    TASK_CONCURRENCY: int = int(os.getenv("TASK_CONCURRENCY", "4"))
+    TASK_POLL_INTERVAL: float = float(os.getenv("TASK_POLL_INTERVAL", "1.0"))
+    # A running job whose worker stops renewing this lease is handed to another worker
+    TASK_LEASE_SECONDS: int = int(os.getenv("TASK_LEASE_SECONDS", "60"))
+    TASK_RESULT_TTL_SECONDS: int = int(os.getenv("TASK_RESULT_TTL_SECONDS", "86400"))
+    
+    # Outgoing email; sending is skipped when SMTP_HOST is empty
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_USER: str = os.getenv("SMTP_USER", "")
+    SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    SMTP_TLS: bool = os.getenv("SMTP_TLS", "true").lower() == "true"
+    EMAILS_FROM: str = os.getenv("EMAILS_FROM", "invoices@example.com")
     
     # CORS
     CORS_ORIGINS: list = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
@@ -0,0 +1,35 @@
+import hashlib
+from typing import Iterable, Optional
+from fastapi import Response, status
+
+
+def weak_etag(versions: Iterable) -> str:
+    """
+    Build a weak ETag from the version markers of a representation.
+
+    Callers pass what changes whenever the response would (ids and
+    updated_at values), so the ETag can be computed without serializing.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for version in versions:
+        digest.update(str(version).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    """Empty 304 response carrying the current ETag and any other headers of the 200."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**(headers or {}), "ETag": etag})
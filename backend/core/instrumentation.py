@@ -0,0 +1,89 @@
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from fastapi import Request
+from sqlalchemy import event
+
+
+class QueryStats:
+    """Number of queries and total time spent in the database."""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Stats of the request currently being handled, if any
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# "METHOD /route/{template}" -> {"requests", "queries", "db_seconds"}
+_route_stats: Dict[str, dict] = {}
+
+_SERVER_TIMING_QUERIES = re.compile(r'db;desc="(\d+) queries"')
+
+
+def install_query_hooks(engine) -> None:
+    """Count and time every statement run through the engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the statement's own context: a statement that raises never
+        # reaches after_cursor_execute, so a per-connection stack would leak
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+
+async def query_timing_middleware(request: Request, call_next):
+    """
+    Record query count and DB time per request.
+
+    The figures are returned in a `Server-Timing` header and aggregated per route.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    response.headers["Server-Timing"] = f'db;desc="{stats.count} queries";dur={stats.seconds * 1000:.2f}'
+
+    route = request.scope.get("route")
+    if route is not None:
+        key = f"{request.method} {route.path}"
+        totals = _route_stats.setdefault(key, {"requests": 0, "queries": 0, "db_seconds": 0.0})
+        totals["requests"] += 1
+        totals["queries"] += stats.count
+        totals["db_seconds"] += stats.seconds
+    return response
+
+
+def route_query_stats() -> Dict[str, dict]:
+    """Query counts and DB time aggregated per route since startup."""
+    return {key: dict(totals) for key, totals in _route_stats.items()}
+
+
+def assert_max_queries(response, max_queries: int) -> None:
+    """
+    Test helper: fail if a response's request ran more than `max_queries` queries.
+
+    Works with any client that exposes response headers (TestClient, httpx, requests).
+    """
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get("Server-Timing", ""))
+    assert match, "Response has no db Server-Timing entry"
+    count = int(match.group(1))
+    assert count <= max_queries, (
+        f"{response.request.method} {response.request.url.path} ran {count} queries, "
+        f"expected at most {max_queries}"
+    )
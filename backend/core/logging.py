@@ -1,12 +1,110 @@
+import atexit
+import copy
+import json
 import logging
 import logging.config
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from core.config import settings
 
 # Create logs directory
 logs_dir = Path("logs")
 logs_dir.mkdir(exist_ok=True)
 
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler that only flushes when told to.
+
+    Used behind a BatchingQueueListener, which flushes once per drained batch
+    so a burst of records costs one write instead of one per record.
+    """
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+    def close(self) -> None:
+        self.flush_batch()
+        super().close()
+
+
+class DeferredFormatQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    QueueHandler.prepare() formats every record so it can be pickled; the
+    queue here stays in-process, so the record keeps its msg and args and
+    is only copied. Exceptions are rendered to exc_text now, while the
+    traceback is still intact, and exc_info is dropped.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class BatchingQueueListener(QueueListener):
+    """Queue listener that drains records in batches and flushes files per batch."""
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, batch_size: int = 500):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self) -> None:
+        log_queue = self.queue
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                log_queue.task_done()
+                if record is self._sentinel:
+                    stop = True
+                elif not stop:
+                    self.handle(record)
+
+            for handler in self.handlers:
+                if isinstance(handler, BatchedRotatingFileHandler):
+                    handler.flush_batch()
+            if stop:
+                break
+
+
+formatter = "json" if settings.LOG_FORMAT == "json" else "detailed"
+file_handler_class = BatchedRotatingFileHandler if settings.LOG_ASYNC else RotatingFileHandler
+
 LOGGING_CONFIG = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -17,26 +115,29 @@ LOGGING_CONFIG = {
         "detailed": {
             "format": "%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s",
         },
+        "json": {
+            "()": JsonFormatter,
+        },
     },
     "handlers": {
         "console": {
             "class": "logging.StreamHandler",
             "level": "INFO",
-            "formatter": "default",
+            "formatter": "json" if settings.LOG_FORMAT == "json" else "default",
             "stream": "ext://sys.stdout",
         },
         "file": {
-            "class": "logging.handlers.RotatingFileHandler",
+            "()": file_handler_class,
             "level": "DEBUG",
-            "formatter": "detailed",
+            "formatter": formatter,
             "filename": "logs/app.log",
             "maxBytes": 10485760,  # 10MB
             "backupCount": 5,
         },
         "error_file": {
-            "class": "logging.handlers.RotatingFileHandler",
+            "()": file_handler_class,
             "level": "ERROR",
-            "formatter": "detailed",
+            "formatter": formatter,
             "filename": "logs/error.log",
             "maxBytes": 10485760,  # 10MB
             "backupCount": 5,
@@ -44,7 +145,7 @@ LOGGING_CONFIG = {
     },
     "loggers": {
         "": {  # Root logger
-            "level": "DEBUG",
+            "level": settings.LOG_LEVEL,
             "handlers": ["console", "file", "error_file"],
         },
         "uvicorn.access": {
@@ -57,6 +158,33 @@ LOGGING_CONFIG = {
 
 logging.config.dictConfig(LOGGING_CONFIG)
 
+
+def _enqueue_handlers(logger: logging.Logger) -> None:
+    """
+    Move a logger's handlers behind a queue drained by a background thread.
+
+    The request path then only pays for copying the record onto the queue
+    (plus rendering the traceback of records with exceptions); formatting
+    and file I/O happen on the listener thread.
+    """
+    handlers = list(logger.handlers)
+    if not handlers:
+        return
+    log_queue: queue.Queue = queue.Queue(-1)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(DeferredFormatQueueHandler(log_queue))
+
+    listener = BatchingQueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+
+if settings.LOG_ASYNC:
+    _enqueue_handlers(logging.getLogger())
+    _enqueue_handlers(logging.getLogger("uvicorn.access"))
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name."""
     return logging.getLogger(name)
@@ -0,0 +1,225 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List
+from fastapi import Request
+from core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(**labels) -> str:
+    """Render labels in exposition format; also used as the series key."""
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process Prometheus registry.
+
+    Counters and histograms are plain dicts keyed by rendered label strings, so
+    recording a sample is a couple of dict operations. Collectors registered
+    with add_collector() contribute point-in-time values (pool, caches) at
+    scrape time. With METRICS_MULTIPROC_DIR set, each worker periodically
+    writes its snapshot there and a scrape sums the snapshots of the live
+    workers of the current server run (see _run_id()).
+    """
+
+    def __init__(self, multiproc_dir: str = "", flush_interval: float = 1.0):
+        self.counters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        # name -> labels -> [per-bucket counts..., +Inf count, sum]
+        self.histograms: Dict[str, Dict[str, List[float]]] = defaultdict(dict)
+        self.in_flight = 0
+        self._collectors: List[Callable[[], dict]] = []
+        self._multiproc_dir = Path(multiproc_dir) if multiproc_dir else None
+        self._flush_interval = flush_interval
+        self._last_flush = 0.0
+        self._run_id = _run_id() if self._multiproc_dir else ""
+        if self._multiproc_dir:
+            self._multiproc_dir.mkdir(parents=True, exist_ok=True)
+            # Drops files of dead workers, including those of earlier runs
+            self._read_snapshots()
+
+    def inc(self, name: str, labels: str, value: float = 1) -> None:
+        self.counters[name][labels] += value
+
+    def observe(self, name: str, labels: str, value: float) -> None:
+        series = self.histograms[name].get(labels)
+        if series is None:
+            series = self.histograms[name][labels] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                series[index] += 1
+                break
+        else:
+            series[len(LATENCY_BUCKETS)] += 1
+        series[-1] += value
+
+    def add_collector(self, collector: Callable[[], dict]) -> None:
+        """
+        Register a callable returning {"counters": {...}, "gauges": {...}},
+        each mapping metric name -> labels -> value, evaluated at scrape time.
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """This process's metrics as plain JSON-serializable data."""
+        counters = {name: dict(series) for name, series in self.counters.items()}
+        gauges = {"http_requests_in_flight": {"": self.in_flight}}
+        for collector in self._collectors:
+            collected = collector()
+            for name, series in collected.get("counters", {}).items():
+                counters.setdefault(name, {}).update(series)
+            for name, series in collected.get("gauges", {}).items():
+                gauges.setdefault(name, {}).update(series)
+        return {
+            "pid": os.getpid(),
+            "run": self._run_id,
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": {name: dict(series) for name, series in self.histograms.items()},
+        }
+
+    def maybe_flush(self) -> None:
+        """Write this worker's snapshot to the multiprocess dir, at most once per interval."""
+        if not self._multiproc_dir:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < self._flush_interval:
+            return
+        self._last_flush = now
+        path = self._multiproc_dir / f"metrics_{os.getpid()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp_path, path)
+
+    def _read_snapshots(self) -> List[dict]:
+        """Snapshots of live workers of this run; files of dead workers are deleted."""
+        snapshots = []
+        for path in self._multiproc_dir.glob("metrics_*.json"):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if not _pid_alive(snapshot["pid"]):
+                path.unlink(missing_ok=True)
+            elif snapshot.get("run") == self._run_id:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def _snapshots(self) -> List[dict]:
+        if not self._multiproc_dir:
+            return [self.snapshot()]
+        self._last_flush = 0.0
+        self.maybe_flush()
+        return self._read_snapshots()
+
+    def render(self) -> str:
+        """Render all workers' metrics in Prometheus text exposition format."""
+        counters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        gauges: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        histograms: Dict[str, Dict[str, List[float]]] = defaultdict(dict)
+        for snapshot in self._snapshots():
+            for name, series in snapshot["counters"].items():
+                for labels, value in series.items():
+                    counters[name][labels] += value
+            for name, series in snapshot["gauges"].items():
+                for labels, value in series.items():
+                    gauges[name][labels] += value
+            for name, series in snapshot["histograms"].items():
+                for labels, values in series.items():
+                    merged = histograms[name].get(labels)
+                    if merged is None:
+                        histograms[name][labels] = list(values)
+                    else:
+                        histograms[name][labels] = [a + b for a, b in zip(merged, values)]
+
+        lines = []
+        for name, series in sorted(counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(_sample(name, labels, value) for labels, value in series.items())
+        for name, series in sorted(gauges.items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(_sample(name, labels, value) for labels, value in series.items())
+        for name, series in sorted(histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for labels, values in series.items():
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), values[:-1]):
+                    cumulative += count
+                    bucket_labels = ",".join(filter(None, [labels, f'le="{bound}"']))
+                    lines.append(_sample(f"{name}_bucket", bucket_labels, cumulative))
+                lines.append(_sample(f"{name}_sum", labels, values[-1]))
+                lines.append(_sample(f"{name}_count", labels, cumulative))
+        return "\n".join(lines) + "\n"
+
+
+def _sample(name: str, labels: str, value: float) -> str:
+    return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+def _process_start(pid: int) -> str:
+    """Start time of a process in clock ticks since boot, "" where /proc is unavailable."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return ""
+    # Fields after the parenthesized command name; starttime is field 22
+    return stat.rsplit(")", 1)[1].split()[19]
+
+
+def _run_id() -> str:
+    """
+    Id shared by all workers of one server run and no other.
+
+    METRICS_RUN_ID wins when set in the environment the server is started
+    with. Otherwise it is the pid and start time of the server master: the
+    parent of a uvicorn --workers or gunicorn worker, else this process.
+    """
+    if settings.METRICS_RUN_ID:
+        return settings.METRICS_RUN_ID
+    is_worker = multiprocessing.parent_process() is not None or "gunicorn" in sys.modules
+    master = os.getppid() if is_worker else os.getpid()
+    return f"{master}-{_process_start(master)}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+metrics = MetricsRegistry(
+    multiproc_dir=settings.METRICS_MULTIPROC_DIR,
+    flush_interval=settings.METRICS_FLUSH_INTERVAL,
+)
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Record request count, latency and in-flight requests per route."""
+    metrics.in_flight += 1
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.in_flight -= 1
+        # Unmatched paths share one label to keep cardinality bounded
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.inc("http_requests_total", format_labels(method=request.method, route=path, status=status_code))
+        metrics.observe("http_request_duration_seconds", format_labels(method=request.method, route=path), elapsed)
+        metrics.maybe_flush()
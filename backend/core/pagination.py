@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional, Sequence, Tuple
+from sqlalchemy import tuple_
+
+# Keyset position of a row: (sort value, id); the sort value is created_at
+# unless the endpoint supports other orderings
+CursorPosition = Tuple[Any, int]
+
+# How cursor sort values are parsed back, by the Python type of the sort column
+_CURSOR_PARSERS = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    Decimal: Decimal,
+}
+
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    """Encode a (sort value, id) keyset position as an opaque cursor."""
+    value = value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+    raw = json.dumps([value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, value_type: type = datetime) -> Optional[CursorPosition]:
+    """Decode an opaque cursor back into a (sort value, id) keyset position."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return _CURSOR_PARSERS[value_type](value), int(row_id)
+    except (ValueError, TypeError, ArithmeticError):
+        return None
+
+
+def paginate(
+    query,
+    model,
+    position: Optional[CursorPosition],
+    skip: int,
+    limit: int,
+    sort_column=None,
+    descending: bool = False,
+):
+    """
+    Apply a stable (sort column, id) ordering and either keyset or offset paging.
+
+    The sort column defaults to created_at. When a cursor position is given
+    the offset is ignored and the query seeks straight past the position,
+    which the (…, sort column, id) indexes serve without scanning earlier rows.
+    """
+    sort_column = model.created_at if sort_column is None else sort_column
+    if descending:
+        query = query.order_by(sort_column.desc(), model.id.desc())
+    else:
+        query = query.order_by(sort_column, model.id)
+    if position is not None:
+        key = tuple_(sort_column, model.id)
+        query = query.where(key < position if descending else key > position)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def next_cursor(rows: Sequence, limit: int, sort_field: str = "created_at") -> Optional[str]:
+    """Return the cursor for the page after `rows`, or None on the last page."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_field), last.id)
@@ -1,3 +1,8 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,6 +12,34 @@ from core.config import settings
 # Password hashing context
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+# Hashing runs on its own bounded pool (hashlib's pbkdf2 releases the GIL),
+# with a separate limit on how many hashes may be queued or running at once
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+_hash_stats = {"in_flight": 0, "waiting": 0, "completed": 0, "wait_seconds": 0.0, "total_seconds": 0.0}
+
+# Decoded claims of recently verified tokens: sha256(token) -> (exp, payload)
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+if settings.JWT_BACKEND == "pyjwt":
+    # Optional faster decoder, same claims and errors as python-jose
+    try:
+        import jwt as pyjwt
+    except ImportError as e:
+        raise RuntimeError("JWT_BACKEND=pyjwt needs the PyJWT package (pip install PyJWT)") from e
+
+    def _decode_token(token: str) -> dict:
+        try:
+            return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+else:
+    def _decode_token(token: str) -> dict:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -18,6 +51,38 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_hash(func, *args):
+    """Run a hashing function on the hash pool without blocking the event loop."""
+    _hash_stats["waiting"] += 1
+    queued = time.perf_counter()
+    async with _hash_slots:
+        _hash_stats["waiting"] -= 1
+        _hash_stats["wait_seconds"] += time.perf_counter() - queued
+        _hash_stats["in_flight"] += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+        finally:
+            _hash_stats["in_flight"] -= 1
+            _hash_stats["completed"] += 1
+            _hash_stats["total_seconds"] += time.perf_counter() - start
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash on the hash pool."""
+    return await _run_hash(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hash pool."""
+    return await _run_hash(get_password_hash, password)
+
+
+def password_hash_stats() -> dict:
+    """Queue depth, in-flight count and timings of the hash pool."""
+    return dict(_hash_stats)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -32,9 +97,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def verify_token(token: str) -> Optional[dict]:
-    """Verify and decode a JWT token."""
+    """
+    Verify and decode a JWT token.
+
+    Successfully verified tokens are cached by hash until their `exp`, so a
+    token reused across requests is only signature-checked once.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        exp, payload = cached
+        if exp is None or exp > time.time():
+            _token_cache.move_to_end(key)
+            return payload
+        del _token_cache[key]
+    
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
+        payload = _decode_token(token)
     except JWTError:
         return None
+    
+    if settings.JWT_CACHE_MAX_SIZE > 0:
+        _token_cache[key] = (payload.get("exp"), payload)
+        while len(_token_cache) > settings.JWT_CACHE_MAX_SIZE:
+            _token_cache.popitem(last=False)
+    return payload
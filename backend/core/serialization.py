@@ -0,0 +1,30 @@
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi import Response
+
+
+def _default(value: Any) -> Any:
+    # Decimals are rendered as strings, matching Pydantic's JSON output
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON with orjson; datetimes, dates and enums are handled natively."""
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered with orjson.
+
+    Returning one from an endpoint bypasses FastAPI's response_model
+    validation, so the content must already match the declared schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,37 +1,114 @@
 from sqlmodel import SQLModel, create_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event, inspect, literal, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
-import os
 from dotenv import load_dotenv
 
+from core.config import settings
+from core.logging import get_logger
+
 load_dotenv()
 
+logger = get_logger(__name__)
+
 # Import all models to ensure they are registered with SQLModel
-from models import User, Client, Invoice, InvoiceItem, Payment
+from models import User, Client, Invoice, InvoiceItem, InvoiceNumberSequence, InvoiceSummary, Payment, Job, RecurringInvoice, RecurringInvoiceItem, ExchangeRate
 
 # Database URL
 # Use SQLite for local development if Docker is not available
-USE_SQLITE = os.getenv("USE_SQLITE", "true").lower() == "true"
+USE_SQLITE = settings.USE_SQLITE
 
 if USE_SQLITE:
     # SQLite for local development (no Docker required)
     DATABASE_URL = "sqlite+aiosqlite:///./invoicing.db"
+    connect_args = {}
 else:
     # PostgreSQL (requires Docker)
-    DB_HOST = os.getenv("DB_HOST", "localhost")
-    DATABASE_URL = f"postgresql+asyncpg://postgres:password@{DB_HOST}:5432/invoicing_db"
+    DATABASE_URL = (
+        f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}"
+        f"@{settings.DB_HOST}:5432/{settings.DB_NAME}"
+    )
+    connect_args = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.DB_ECHO,
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
+
+if USE_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _tune_sqlite(dbapi_connection, connection_record):
+        """Enable WAL so readers don't block on the writer, and relax fsyncs."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA cache_size=-64000")  # 64MB
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+# Dialect-specific INSERT, for ON CONFLICT upserts
+dialect_insert = sqlite.insert if USE_SQLITE else postgresql.insert
+
+# Built once; sessions are cheap, the factory is not
+async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _add_missing_columns(conn) -> None:
+    """
+    Add model columns that existing tables lack; create_all only creates whole tables.
+
+    New columns get their model default, so NOT NULL columns can be added to
+    tables that already hold rows.
+    """
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+            default = column.default
+            if default is not None and (default.is_scalar or default.is_callable):
+                value = default.arg if default.is_scalar else default.arg(None)
+                value = literal(value, column.type).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+                ddl += f" DEFAULT {value}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            conn.execute(text(ddl))
+            logger.warning("Added missing column %s.%s", table.name, column.name)
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
 
 async def init_db():
     async with engine.begin() as conn:
         # await conn.run_sync(SQLModel.metadata.drop_all)
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+
 
 async def get_session() -> AsyncSession:
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
     async with async_session() as session:
         yield session
+
+
+def pool_status() -> dict:
+    """Connection pool occupancy, to spot pool exhaustion under load."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
@@ -1,11 +1,18 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
-from database import init_db
-from api import auth_router, users_router, clients_router, invoices_router, payments_router
+import asyncio
+from database import engine, init_db, pool_status, async_session
+from api import auth_router, users_router, clients_router, invoices_router, payments_router, search_router, tasks_router, recurring_invoices_router, reports_router
 from core.config import settings
 from core.logging import get_logger
+from core.cache import cache_stats
+from core.instrumentation import install_query_hooks, query_timing_middleware, route_query_stats
+from core.metrics import metrics, metrics_middleware, format_labels
+from core.security import password_hash_stats
+from services import rebuild_invoice_summaries, summaries_need_rebuild, balances_need_backfill, reconcile_invoice_balances, run_overdue_sweeper, init_search, init_exchange_rates, shutdown_render_pool, task_queue, run_recurring_generator
 
 logger = get_logger(__name__)
 
@@ -14,10 +21,35 @@ async def lifespan(app: FastAPI):
     # Startup: Create tables
     logger.info("Starting application initialization")
     await init_db()
+    await init_search()
+    await init_exchange_rates()
+    async with async_session() as session:
+        if await summaries_need_rebuild(session):
+            logger.info("Backfilling invoice summaries")
+            await rebuild_invoice_summaries(session)
+        # After the summaries, which the reconciliation then corrects alongside
+        if await balances_need_backfill(session):
+            logger.info("Backfilling invoice balances from payments")
+            await reconcile_invoice_balances(fix=True)
     logger.info("Database initialized successfully")
+    sweeper = None
+    if settings.OVERDUE_SWEEP_IN_PROCESS:
+        sweeper = asyncio.create_task(run_overdue_sweeper())
+    worker = None
+    if settings.TASK_WORKER_IN_PROCESS:
+        worker = asyncio.create_task(task_queue.run_worker())
+    recurring = None
+    if settings.RECURRING_IN_PROCESS:
+        recurring = asyncio.create_task(run_recurring_generator())
     yield
     # Shutdown: Clean up resources if needed
     logger.info("Shutting down application")
+    background = [task for task in (sweeper, worker, recurring) if task]
+    for task in background:
+        task.cancel()
+    # Let an interrupted task job put itself back in the queue
+    await asyncio.gather(*background, return_exceptions=True)
+    shutdown_render_pool()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -26,14 +58,46 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+# Per-request query count and DB time (Server-Timing header)
+install_query_hooks(engine)
+app.middleware("http")(query_timing_middleware)
+app.middleware("http")(metrics_middleware)
+
+
+def collect_runtime_metrics() -> dict:
+    """Pool occupancy, cache hit counters, per-route DB usage and hash pool load for /metrics."""
+    caches = cache_stats()
+    routes = route_query_stats()
+    hashing = password_hash_stats()
+    return {
+        "gauges": {
+            **{f"db_pool_{key}": {"": value} for key, value in pool_status().items()},
+            "password_hash_waiting": {"": hashing["waiting"]},
+            "password_hash_in_flight": {"": hashing["in_flight"]},
+        },
+        "counters": {
+            "password_hash_completed_total": {"": hashing["completed"]},
+            "password_hash_wait_seconds_total": {"": hashing["wait_seconds"]},
+            "password_hash_seconds_total": {"": hashing["total_seconds"]},
+            "cache_hits_total": {format_labels(cache=name): stats["hits"] for name, stats in caches.items()},
+            "cache_misses_total": {format_labels(cache=name): stats["misses"] for name, stats in caches.items()},
+            "db_queries_total": {format_labels(route=route): stats["queries"] for route, stats in routes.items()},
+            "db_query_seconds_total": {format_labels(route=route): stats["db_seconds"] for route, stats in routes.items()},
+        },
+    }
+
+
+metrics.add_collector(collect_runtime_metrics)
+
 # Configure CORS with settings
-logger.info(f"Configuring CORS with origins: {settings.CORS_ORIGINS}")
+logger.info("Configuring CORS with origins: %s", settings.CORS_ORIGINS)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=settings.CORS_CREDENTIALS,
     allow_methods=settings.CORS_METHODS,
     allow_headers=settings.CORS_HEADERS,
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
 )
 
 # Include routers
@@ -42,6 +106,10 @@ app.include_router(users_router, prefix="/api")
 app.include_router(clients_router, prefix="/api")
 app.include_router(invoices_router, prefix="/api")
 app.include_router(payments_router, prefix="/api")
+app.include_router(search_router, prefix="/api")
+app.include_router(tasks_router, prefix="/api")
+app.include_router(recurring_invoices_router, prefix="/api")
+app.include_router(reports_router, prefix="/api")
 
 @app.get("/")
 def read_root():
@@ -55,4 +123,11 @@ def health_check():
         "status": "ok",
         "environment": settings.ENVIRONMENT,
         "version": settings.VERSION,
+        "database_pool": pool_status(),
     }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,7 +1,10 @@
 from .user import User
 from .client import Client
-from .invoice import Invoice, InvoiceItem, InvoiceStatus
+from .invoice import Invoice, InvoiceItem, InvoiceStatus, InvoiceNumberSequence, InvoiceSummary
 from .payment import Payment, PaymentMethod
+from .job import Job, JobStatus
+from .recurring import RecurrenceInterval, RecurringInvoice, RecurringInvoiceItem
+from .exchange_rate import ExchangeRate
 
 __all__ = [
     "User",
@@ -9,6 +12,14 @@ __all__ = [
     "Invoice",
     "InvoiceItem",
     "InvoiceStatus",
+    "InvoiceNumberSequence",
+    "InvoiceSummary",
     "Payment",
     "PaymentMethod",
+    "Job",
+    "JobStatus",
+    "RecurrenceInterval",
+    "RecurringInvoice",
+    "RecurringInvoiceItem",
+    "ExchangeRate",
 ]
@@ -0,0 +1,18 @@
+from datetime import date
+from typing import Optional
+from decimal import Decimal
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+# Value of one unit of `currency` in the base currency, effective from rate_date
+class ExchangeRate(SQLModel, table=True):
+    __tablename__ = "exchange_rates"
+    __table_args__ = (
+        Index("ux_exchange_rates_currency_date", "currency", "rate_date", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    currency: str = Field(max_length=3)
+    rate_date: date
+    rate: Decimal = Field(max_digits=18, decimal_places=8)
@@ -1,9 +1,12 @@
 from datetime import datetime, date
 from typing import Optional, List
 from decimal import Decimal
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 from enum import Enum
 
+from core.config import settings
+
 
 class InvoiceStatus(str, Enum):
     DRAFT = "draft"
@@ -15,6 +18,18 @@ class InvoiceStatus(str, Enum):
 
 class Invoice(SQLModel, table=True):
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? ORDER BY created_at, id
+        Index("ix_invoices_user_created_id", "user_id", "created_at", "id"),
+        # Overdue sweep: WHERE status = 'sent' AND due_date < today
+        Index("ix_invoices_status_due_date", "status", "due_date"),
+        # List filters and sorts: WHERE user_id = ? [AND ...] ORDER BY <column>, id
+        Index("ix_invoices_user_status_due_date", "user_id", "status", "due_date", "id"),
+        Index("ix_invoices_user_client_created_id", "user_id", "client_id", "created_at", "id"),
+        Index("ix_invoices_user_issue_date_id", "user_id", "issue_date", "id"),
+        Index("ix_invoices_user_due_date_id", "user_id", "due_date", "id"),
+        Index("ix_invoices_user_total_id", "user_id", "total", "id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -28,6 +43,11 @@ class Invoice(SQLModel, table=True):
     tax_amount: Decimal = Field(default=Decimal("0.00"), max_digits=10, decimal_places=2)
     discount_amount: Decimal = Field(default=Decimal("0.00"), max_digits=10, decimal_places=2)
     total: Decimal = Field(default=Decimal("0.00"), max_digits=10, decimal_places=2)
+    # ISO 4217 code all amounts of the invoice are in
+    currency: str = Field(default_factory=lambda: settings.BASE_CURRENCY, max_length=3)
+    # Denormalized from payments, maintained in the payment write transactions
+    amount_paid: Decimal = Field(default=Decimal("0.00"), max_digits=10, decimal_places=2)
+    balance_due: Decimal = Field(default=Decimal("0.00"), max_digits=10, decimal_places=2)
     notes: Optional[str] = None
     terms: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -51,3 +71,31 @@ class InvoiceItem(SQLModel, table=True):
     
     # Relationships
     invoice: Optional[Invoice] = Relationship(back_populates="items")
+
+
+class InvoiceNumberSequence(SQLModel, table=True):
+    __tablename__ = "invoice_number_sequences"
+    
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    series: str = Field(primary_key=True)
+    # First number not yet reserved by any process
+    next_value: int = Field(default=1)
+
+
+# Per-user invoice aggregates, maintained incrementally by the write endpoints
+class InvoiceSummary(SQLModel, table=True):
+    __tablename__ = "invoice_summaries"
+    __table_args__ = (
+        Index("ux_invoice_summaries_bucket", "user_id", "client_id", "status", "month", "currency", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    client_id: int = Field(foreign_key="clients.id")
+    status: InvoiceStatus
+    # Issue month, "YYYY-MM"
+    month: str
+    currency: str = Field(default_factory=lambda: settings.BASE_CURRENCY, max_length=3)
+    invoice_count: int = Field(default=0)
+    total: Decimal = Field(default=Decimal("0.00"), max_digits=14, decimal_places=2)
+    amount_paid: Decimal = Field(default=Decimal("0.00"), max_digits=14, decimal_places=2)
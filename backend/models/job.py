@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+# Background task queued through the database broker
+class Job(SQLModel, table=True):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claiming: WHERE status = 'queued' AND run_after <= now ORDER BY priority, run_after
+        Index("ix_jobs_status_priority_run_after", "status", "priority", "run_after"),
+    )
+    
+    id: str = Field(primary_key=True)
+    name: str
+    # JSON {"args": [...], "kwargs": {...}}
+    payload: str
+    # 0 is the highest priority, as with Celery on Redis
+    priority: int = Field(default=5)
+    status: JobStatus = Field(default=JobStatus.QUEUED)
+    attempts: int = Field(default=0)
+    max_retries: int = Field(default=3)
+    run_after: datetime = Field(default_factory=datetime.utcnow)
+    # Lease of the worker running the job, extended by its heartbeat; an
+    # expired lease means the worker died and the job is queued again
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,9 +1,12 @@
 from datetime import datetime
 from typing import Optional
 from decimal import Decimal
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 from enum import Enum
 
+from core.config import settings
+
 
 class PaymentMethod(str, Enum):
     CASH = "cash"
@@ -17,10 +20,18 @@ class PaymentMethod(str, Enum):
 
 class Payment(SQLModel, table=True):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Keyset pagination, with and without the invoice_id filter; the first
+        # also serves every per-invoice lookup and SUM(amount) by invoice_id
+        Index("ix_payments_invoice_created_id", "invoice_id", "created_at", "id"),
+        Index("ix_payments_created_id", "created_at", "id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     invoice_id: int = Field(foreign_key="invoices.id")
     amount: Decimal = Field(max_digits=10, decimal_places=2)
+    # Always the invoice's currency
+    currency: str = Field(default_factory=lambda: settings.BASE_CURRENCY, max_length=3)
     payment_method: PaymentMethod
     payment_date: datetime = Field(default_factory=datetime.utcnow)
     reference_number: Optional[str] = None
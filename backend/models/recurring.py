@@ -0,0 +1,67 @@
+from datetime import datetime, date
+from typing import Optional, List
+from decimal import Decimal
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel, Relationship
+from enum import Enum
+
+from core.config import settings
+
+
+class RecurrenceInterval(str, Enum):
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    QUARTERLY = "quarterly"
+    YEARLY = "yearly"
+
+
+# Template an invoice is cloned from every `interval_count` intervals
+class RecurringInvoice(SQLModel, table=True):
+    __tablename__ = "recurring_invoices"
+    __table_args__ = (
+        # Generator: WHERE is_active AND next_run <= today ORDER BY next_run, id
+        Index("ix_recurring_invoices_active_next_run", "is_active", "next_run", "id"),
+        # Keyset pagination: WHERE user_id = ? ORDER BY created_at, id
+        Index("ix_recurring_invoices_user_created_id", "user_id", "created_at", "id"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    client_id: int = Field(foreign_key="clients.id", index=True)
+    interval: RecurrenceInterval = Field(default=RecurrenceInterval.MONTHLY)
+    interval_count: int = Field(default=1)
+    # Issue date of the first invoice; later runs are computed from it so
+    # month-end schedules do not drift
+    start_date: date
+    end_date: Optional[date] = None
+    # Issue date of the next invoice to generate
+    next_run: date
+    # Invoices generated so far
+    occurrences: int = Field(default=0)
+    last_run: Optional[date] = None
+    is_active: bool = Field(default=True)
+    # Days between an invoice's issue and due dates
+    payment_terms_days: int = Field(default=30)
+    tax_rate: Decimal = Field(default=Decimal("0.00"), max_digits=5, decimal_places=2)
+    discount_amount: Decimal = Field(default=Decimal("0.00"), max_digits=10, decimal_places=2)
+    currency: str = Field(default_factory=lambda: settings.BASE_CURRENCY, max_length=3)
+    notes: Optional[str] = None
+    terms: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Relationships
+    items: List["RecurringInvoiceItem"] = Relationship(back_populates="template", cascade_delete=True)
+
+
+class RecurringInvoiceItem(SQLModel, table=True):
+    __tablename__ = "recurring_invoice_items"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    template_id: int = Field(foreign_key="recurring_invoices.id", index=True)
+    description: str
+    quantity: Decimal = Field(default=Decimal("1.00"), max_digits=10, decimal_places=2)
+    unit_price: Decimal = Field(max_digits=10, decimal_places=2)
+    
+    # Relationships
+    template: Optional[RecurringInvoice] = Relationship(back_populates="items")
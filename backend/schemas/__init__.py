@@ -1,7 +1,26 @@
 from .user import UserCreate, UserUpdate, UserResponse
-from .client import ClientCreate, ClientUpdate, ClientResponse
-from .invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceItemCreate, InvoiceItemResponse
+from .client import ClientCreate, ClientUpdate, ClientResponse, ClientImportError, ClientImportResponse
+from .invoice import (
+    InvoiceCreate,
+    InvoiceUpdate,
+    InvoiceResponse,
+    InvoiceItemCreate,
+    InvoiceItemResponse,
+    InvoiceBulkResult,
+    InvoiceBulkResponse,
+    InvoiceSummaryGroup,
+    InvoiceSummaryResponse,
+)
 from .payment import PaymentCreate, PaymentUpdate, PaymentResponse
+from .search import SearchResult
+from .task import TaskResponse
+from .recurring import (
+    RecurringInvoiceCreate,
+    RecurringInvoiceUpdate,
+    RecurringInvoiceResponse,
+    RecurringInvoiceItemResponse,
+)
+from .report import AgingBuckets, AgingClientRow, AgingReportResponse
 
 __all__ = [
     "UserCreate",
@@ -10,12 +29,27 @@ __all__ = [
     "ClientCreate",
     "ClientUpdate",
     "ClientResponse",
+    "ClientImportError",
+    "ClientImportResponse",
     "InvoiceCreate",
     "InvoiceUpdate",
     "InvoiceResponse",
     "InvoiceItemCreate",
     "InvoiceItemResponse",
+    "InvoiceBulkResult",
+    "InvoiceBulkResponse",
+    "InvoiceSummaryGroup",
+    "InvoiceSummaryResponse",
     "PaymentCreate",
     "PaymentUpdate",
     "PaymentResponse",
+    "SearchResult",
+    "TaskResponse",
+    "RecurringInvoiceCreate",
+    "RecurringInvoiceUpdate",
+    "RecurringInvoiceResponse",
+    "RecurringInvoiceItemResponse",
+    "AgingBuckets",
+    "AgingClientRow",
+    "AgingReportResponse",
 ]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 
 
@@ -43,3 +43,20 @@ class ClientResponse(ClientBase):
 
     class Config:
         from_attributes = True
+
+
+class ClientImportError(BaseModel):
+    # 1-based line of the CSV, counting the header
+    line: int
+    email: Optional[str] = None
+    error: str
+
+
+class ClientImportResponse(BaseModel):
+    rows: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[ClientImportError]
+    seconds: float
+    rows_per_second: float
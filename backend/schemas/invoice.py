@@ -1,7 +1,7 @@
 from datetime import datetime, date
 from typing import Optional, List
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from models.invoice import InvoiceStatus
 
 
@@ -29,6 +29,8 @@ class InvoiceItemResponse(InvoiceItemBase):
 class InvoiceBase(BaseModel):
     client_id: int
     due_date: date
+    # ISO 4217 code; defaults to BASE_CURRENCY
+    currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$")
     tax_rate: Optional[Decimal] = Decimal("0.00")
     discount_amount: Optional[Decimal] = Decimal("0.00")
     notes: Optional[str] = None
@@ -53,14 +55,57 @@ class InvoiceResponse(InvoiceBase):
     id: int
     user_id: int
     invoice_number: str
+    currency: str
     status: InvoiceStatus
     issue_date: date
     subtotal: Decimal
     tax_amount: Decimal
     total: Decimal
+    amount_paid: Decimal
+    balance_due: Decimal
     created_at: datetime
     updated_at: datetime
     items: List[InvoiceItemResponse] = []
 
     class Config:
         from_attributes = True
+
+
+class InvoiceBulkResult(BaseModel):
+    index: int
+    invoice_id: Optional[int] = None
+    invoice_number: Optional[str] = None
+    error: Optional[str] = None
+
+
+class InvoiceBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[InvoiceBulkResult]
+
+
+class InvoiceSummaryGroup(BaseModel):
+    status: Optional[InvoiceStatus] = None
+    month: Optional[str] = None
+    client_id: Optional[int] = None
+    currency: Optional[str] = None
+    invoice_count: int
+    total: Decimal
+    amount_paid: Decimal
+    outstanding: Decimal
+
+
+class InvoiceSummaryResponse(BaseModel):
+    # Amounts are converted to this currency, except in by_currency
+    currency: str
+    # Currencies without a known exchange rate, left out of converted totals
+    unconverted_currencies: List[str] = []
+    invoice_count: int
+    total: Decimal
+    amount_paid: Decimal
+    outstanding: Decimal
+    overdue: Decimal
+    by_status: List[InvoiceSummaryGroup]
+    by_month: List[InvoiceSummaryGroup]
+    by_client: List[InvoiceSummaryGroup]
+    by_currency: List[InvoiceSummaryGroup]
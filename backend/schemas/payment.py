@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from models.payment import PaymentMethod
 
 
@@ -14,7 +14,8 @@ class PaymentBase(BaseModel):
 
 
 class PaymentCreate(PaymentBase):
-    pass
+    # Must match the invoice's currency when given
+    currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$")
 
 
 class PaymentUpdate(BaseModel):
@@ -27,6 +28,7 @@ class PaymentUpdate(BaseModel):
 
 class PaymentResponse(PaymentBase):
     id: int
+    currency: str
     payment_date: datetime
     created_at: datetime
     updated_at: datetime
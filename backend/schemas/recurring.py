@@ -0,0 +1,66 @@
+from datetime import datetime, date
+from typing import Optional, List
+from decimal import Decimal
+from pydantic import BaseModel, Field, model_validator
+from models.recurring import RecurrenceInterval
+from .invoice import InvoiceItemCreate
+
+
+class RecurringInvoiceItemResponse(InvoiceItemCreate):
+    id: int
+    template_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class RecurringInvoiceBase(BaseModel):
+    client_id: int
+    interval: RecurrenceInterval = RecurrenceInterval.MONTHLY
+    interval_count: int = Field(1, ge=1)
+    end_date: Optional[date] = None
+    payment_terms_days: int = Field(30, ge=0)
+    tax_rate: Optional[Decimal] = Decimal("0.00")
+    discount_amount: Optional[Decimal] = Decimal("0.00")
+    # ISO 4217 code; defaults to BASE_CURRENCY
+    currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$")
+    notes: Optional[str] = None
+    terms: Optional[str] = None
+
+
+class RecurringInvoiceCreate(RecurringInvoiceBase):
+    start_date: date
+    items: List[InvoiceItemCreate]
+
+    @model_validator(mode="after")
+    def check_end_date(self) -> "RecurringInvoiceCreate":
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+
+class RecurringInvoiceUpdate(BaseModel):
+    end_date: Optional[date] = None
+    is_active: Optional[bool] = None
+    payment_terms_days: Optional[int] = Field(None, ge=0)
+    tax_rate: Optional[Decimal] = None
+    discount_amount: Optional[Decimal] = None
+    notes: Optional[str] = None
+    terms: Optional[str] = None
+
+
+class RecurringInvoiceResponse(RecurringInvoiceBase):
+    id: int
+    currency: str
+    user_id: int
+    start_date: date
+    next_run: date
+    occurrences: int
+    last_run: Optional[date] = None
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+    items: List[RecurringInvoiceItemResponse] = []
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,30 @@
+from datetime import date
+from typing import List, Optional
+from decimal import Decimal
+from pydantic import BaseModel
+
+
+class AgingBuckets(BaseModel):
+    # Not yet due
+    current: Decimal = Decimal("0.00")
+    # Days past due
+    days_0_30: Decimal = Decimal("0.00")
+    days_31_60: Decimal = Decimal("0.00")
+    days_61_90: Decimal = Decimal("0.00")
+    days_over_90: Decimal = Decimal("0.00")
+    total: Decimal = Decimal("0.00")
+
+
+class AgingClientRow(AgingBuckets):
+    client_id: int
+    client_name: Optional[str] = None
+
+
+class AgingReportResponse(BaseModel):
+    as_of: date
+    # Amounts are converted to this currency
+    currency: str
+    # Currencies without a known exchange rate, left out of the report
+    unconverted_currencies: List[str] = []
+    totals: AgingBuckets
+    clients: List[AgingClientRow]
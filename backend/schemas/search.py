@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    kind: str
+    id: int
+    title: str
+    rank: float
@@ -0,0 +1,7 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class TaskResponse(BaseModel):
+    task_id: str
+    status: Optional[str] = None
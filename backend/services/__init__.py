@@ -0,0 +1,66 @@
+from .invoice_numbers import InvoiceNumberAllocator, invoice_number_allocator
+from .invoice_builder import calculate_invoice_totals, build_invoice
+from .exchange_rates import ExchangeRateTable, exchange_rates, load_exchange_rates, init_exchange_rates
+from .aging_report import build_aging_report, get_aging_report, invalidate_aging_reports, mark_aging_reports_stale
+from .client_statement import stream_client_statement
+from .client_import import ClientImportFileError, import_clients
+from .invoice_summary import (
+    summary_key,
+    new_deltas,
+    add_invoice,
+    apply_summary_deltas,
+    rebuild_invoice_summaries,
+    summaries_need_rebuild,
+    get_user_summary,
+)
+from .invoice_balance import settled_status, apply_payment_change, balances_need_backfill, reconcile_invoice_balances
+from .overdue_sweeper import sweep_overdue_invoices, run_overdue_sweeper
+from .search import init_search, search
+from .invoice_pdf import render_invoice_html, get_invoice_pdf, get_invoice_pdfs, shutdown_render_pool
+from .task_queue import TaskQueue, task_queue
+from .tasks import render_invoice_pdf, send_invoice_email, rebuild_invoice_reports
+from .recurring_invoices import generate_recurring_invoices, run_recurring_generator
+
+__all__ = [
+    "InvoiceNumberAllocator",
+    "invoice_number_allocator",
+    "calculate_invoice_totals",
+    "build_invoice",
+    "ExchangeRateTable",
+    "exchange_rates",
+    "load_exchange_rates",
+    "init_exchange_rates",
+    "build_aging_report",
+    "get_aging_report",
+    "invalidate_aging_reports",
+    "mark_aging_reports_stale",
+    "stream_client_statement",
+    "ClientImportFileError",
+    "import_clients",
+    "summary_key",
+    "new_deltas",
+    "add_invoice",
+    "apply_summary_deltas",
+    "rebuild_invoice_summaries",
+    "summaries_need_rebuild",
+    "get_user_summary",
+    "settled_status",
+    "apply_payment_change",
+    "balances_need_backfill",
+    "reconcile_invoice_balances",
+    "sweep_overdue_invoices",
+    "run_overdue_sweeper",
+    "init_search",
+    "search",
+    "render_invoice_html",
+    "get_invoice_pdf",
+    "get_invoice_pdfs",
+    "shutdown_render_pool",
+    "TaskQueue",
+    "task_queue",
+    "render_invoice_pdf",
+    "send_invoice_email",
+    "rebuild_invoice_reports",
+    "generate_recurring_invoices",
+    "run_recurring_generator",
+]
@@ -0,0 +1,151 @@
+import asyncio
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+from sqlalchemy import and_, case, event, func
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Client, Invoice, InvoiceStatus
+from schemas import AgingReportResponse
+from core import create_cache, settings
+from services.exchange_rates import exchange_rates
+
+CENT = Decimal("0.01")
+
+# Bucket name -> (fewest, most) days past due; None is unbounded
+AGING_BUCKETS = {
+    "current": (None, -1),
+    "days_0_30": (0, 30),
+    "days_31_60": (31, 60),
+    "days_61_90": (61, 90),
+    "days_over_90": (91, None),
+}
+
+# Reports by user id, dropped whenever one of the user's invoices or payments changes
+aging_cache = create_cache(
+    "aging_reports",
+    ttl=settings.AGING_CACHE_TTL_SECONDS,
+    max_size=settings.AGING_CACHE_MAX_SIZE,
+)
+
+
+def _bucket_sum(today: date, fewest: Optional[int], most: Optional[int]):
+    """SUM of balance_due over invoices `fewest`..`most` days past due, as a due_date range."""
+    conditions = []
+    if most is not None:
+        conditions.append(Invoice.due_date >= today - timedelta(days=most))
+    if fewest is not None:
+        conditions.append(Invoice.due_date <= today - timedelta(days=fewest))
+    return func.sum(case((and_(*conditions), Invoice.balance_due), else_=0))
+
+
+async def build_aging_report(db: AsyncSession, user_id: int, today: Optional[date] = None) -> dict:
+    """
+    Outstanding balances of a user's open invoices, bucketed by days past due, per client.
+
+    One grouped query does the bucketing: each bucket is a SUM(CASE) over a
+    due_date range computed from `today`, so the database never does date
+    arithmetic and the (user_id, status, due_date) index narrows the scan to
+    open invoices. Balances come from the denormalized balance_due. Groups are
+    converted to BASE_CURRENCY at today's rate.
+    """
+    today = today or date.today()
+    bucket_columns = [
+        _bucket_sum(today, fewest, most).label(name) for name, (fewest, most) in AGING_BUCKETS.items()
+    ]
+    result = await db.execute(
+        select(Invoice.client_id, Client.name, Invoice.currency, *bucket_columns)
+        .join(Client, Client.id == Invoice.client_id)
+        .where(
+            Invoice.user_id == user_id,
+            Invoice.status.in_((InvoiceStatus.SENT, InvoiceStatus.OVERDUE)),
+            Invoice.balance_due > 0,
+        )
+        .group_by(Invoice.client_id, Client.name, Invoice.currency)
+    )
+    await exchange_rates.refresh()
+
+    def buckets() -> dict:
+        return {name: Decimal("0.00") for name in (*AGING_BUCKETS, "total")}
+    
+    totals = buckets()
+    clients = defaultdict(buckets)
+    names, unconverted = {}, set()
+    for row in result.all():
+        rate = exchange_rates.rate(row.currency, today)
+        if rate is None:
+            unconverted.add(row.currency)
+            continue
+        names[row.client_id] = row.name
+        for name in AGING_BUCKETS:
+            amount = Decimal(str(getattr(row, name) or 0)) * rate
+            for target in (totals, clients[row.client_id]):
+                target[name] += amount
+                target["total"] += amount
+
+    def rounded(values: dict) -> dict:
+        return {key: value.quantize(CENT) for key, value in values.items()}
+    
+    return {
+        "as_of": today,
+        "currency": settings.BASE_CURRENCY,
+        "unconverted_currencies": sorted(unconverted),
+        "totals": rounded(totals),
+        "clients": sorted(
+            (
+                {"client_id": client_id, "client_name": names[client_id], **rounded(values)}
+                for client_id, values in clients.items()
+            ),
+            key=lambda row: row["total"],
+            reverse=True,
+        ),
+    }
+
+
+async def get_aging_report(db: AsyncSession, user_id: int) -> dict:
+    """The user's aging report as of today, from the cache when nothing changed since it was built."""
+    today = date.today()
+    cached = await aging_cache.get(user_id)
+    if cached is not None and cached["as_of"] == today.isoformat():
+        return cached
+    report = await build_aging_report(db, user_id, today)
+    report = AgingReportResponse.model_validate(report).model_dump(mode="json")
+    await aging_cache.set(user_id, report)
+    return report
+
+
+async def invalidate_aging_reports(user_ids: Iterable[int]) -> None:
+    """Drop cached aging reports of users whose invoices or payments changed."""
+    for user_id in set(user_ids):
+        await aging_cache.delete(user_id)
+
+
+# Invalidations scheduled by commits, kept referenced until they finish
+_pending_invalidations = set()
+
+
+def mark_aging_reports_stale(db: AsyncSession, user_ids: Iterable[int]) -> None:
+    """
+    Invalidate users' cached aging reports once the session's transaction commits.
+
+    Invalidating before the commit would let a concurrent request cache the
+    report as it was before the write; a rollback drops the marks instead.
+    """
+    db.sync_session.info.setdefault("stale_aging_reports", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    user_ids = session.info.pop("stale_aging_reports", None)
+    if user_ids:
+        task = asyncio.get_running_loop().create_task(invalidate_aging_reports(user_ids))
+        _pending_invalidations.add(task)
+        task.add_done_callback(_pending_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("stale_aging_reports", None)
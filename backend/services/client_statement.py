@@ -0,0 +1,150 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import AsyncIterator, Dict, Optional
+from sqlalchemy import Date, Integer, String, cast, func, literal, union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import USE_SQLITE, get_session
+from models import Invoice, InvoiceStatus, Payment
+from core.serialization import dumps
+
+CENT = Decimal("0.01")
+
+# Ledger rows fetched per round trip while streaming
+STATEMENT_BATCH_SIZE = 1000
+
+# Invoices that never became receivables stay off statements
+EXCLUDED_STATUSES = (InvoiceStatus.DRAFT, InvoiceStatus.CANCELLED)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _payment_date():
+    # SQLite has no DATE type; date() yields the same ISO text issue_date is stored as
+    if USE_SQLITE:
+        return func.date(Payment.payment_date)
+    return cast(Payment.payment_date, Date)
+
+
+def _ledger_entries(client_id: int, start: Optional[date], end: Optional[date]):
+    """UNION of the client's invoices (debits) and payments (credits) in the period."""
+    invoices = (
+        select(
+            Invoice.issue_date.label("entry_date"),
+            # Invoices sort before payments made on the same day
+            literal(0, Integer).label("entry_order"),
+            literal("invoice", String).label("entry_type"),
+            Invoice.id.label("entry_id"),
+            Invoice.id.label("invoice_id"),
+            Invoice.invoice_number.label("reference"),
+            Invoice.currency.label("currency"),
+            Invoice.total.label("amount"),
+        )
+        .where(Invoice.client_id == client_id, Invoice.status.not_in(EXCLUDED_STATUSES))
+    )
+    payments = (
+        select(
+            _payment_date().label("entry_date"),
+            literal(1, Integer).label("entry_order"),
+            literal("payment", String).label("entry_type"),
+            Payment.id.label("entry_id"),
+            Payment.invoice_id.label("invoice_id"),
+            Invoice.invoice_number.label("reference"),
+            Payment.currency.label("currency"),
+            (-Payment.amount).label("amount"),
+        )
+        .join(Invoice, Invoice.id == Payment.invoice_id)
+        .where(Invoice.client_id == client_id, Invoice.status.not_in(EXCLUDED_STATUSES))
+    )
+    if start is not None:
+        invoices = invoices.where(Invoice.issue_date >= start)
+        payments = payments.where(Payment.payment_date >= _day_start(start))
+    if end is not None:
+        invoices = invoices.where(Invoice.issue_date <= end)
+        payments = payments.where(Payment.payment_date < _day_start(end + timedelta(days=1)))
+    return union_all(invoices, payments).subquery("entries")
+
+
+async def _opening_balances(db: AsyncSession, client_id: int, start: date) -> Dict[str, Decimal]:
+    """Balance per currency carried into the period: invoiced minus paid before `start`."""
+    invoiced = await db.execute(
+        select(Invoice.currency, func.sum(Invoice.total))
+        .where(
+            Invoice.client_id == client_id,
+            Invoice.status.not_in(EXCLUDED_STATUSES),
+            Invoice.issue_date < start,
+        )
+        .group_by(Invoice.currency)
+    )
+    paid = await db.execute(
+        select(Payment.currency, func.sum(Payment.amount))
+        .join(Invoice, Invoice.id == Payment.invoice_id)
+        .where(
+            Invoice.client_id == client_id,
+            Invoice.status.not_in(EXCLUDED_STATUSES),
+            Payment.payment_date < _day_start(start),
+        )
+        .group_by(Payment.currency)
+    )
+    balances: Dict[str, Decimal] = {}
+    for currency, total in invoiced.all():
+        balances[currency] = balances.get(currency, Decimal("0.00")) + Decimal(str(total))
+    for currency, total in paid.all():
+        balances[currency] = balances.get(currency, Decimal("0.00")) - Decimal(str(total))
+    return {currency: balance.quantize(CENT) for currency, balance in balances.items()}
+
+
+async def stream_client_statement(
+    client_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a client's statement as one JSON document.
+
+    Entries are the client's invoices and payments in date order, each with
+    the running balance of its currency. They come from a single UNION ALL
+    query whose running balance is a window SUM partitioned by currency, read
+    through a server-side cursor in batches, so memory stays flat for clients
+    with long histories. The balance carried in from before `start` is
+    added to the running balance.
+    """
+    async for session in get_session():
+        opening = await _opening_balances(session, client_id, start) if start else {}
+        
+        entries = _ledger_entries(client_id, start, end)
+        ordering = (entries.c.entry_date, entries.c.entry_order, entries.c.entry_id)
+        query = (
+            select(
+                entries,
+                func.sum(entries.c.amount).over(partition_by=entries.c.currency, order_by=ordering).label("balance"),
+            )
+            .order_by(*ordering)
+            .execution_options(yield_per=STATEMENT_BATCH_SIZE)
+        )
+        
+        yield dumps({"client_id": client_id, "from": start, "to": end, "opening_balances": opening})[:-1] + b',"entries":['
+        closing = dict(opening)
+        separator = b""
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            chunk = []
+            for row in rows:
+                balance = (opening.get(row.currency, Decimal("0.00")) + Decimal(str(row.balance))).quantize(CENT)
+                closing[row.currency] = balance
+                chunk.append(separator + dumps({
+                    "date": row.entry_date,
+                    "type": row.entry_type,
+                    "id": row.entry_id,
+                    "invoice_id": row.invoice_id,
+                    "reference": row.reference,
+                    "currency": row.currency,
+                    "amount": Decimal(str(row.amount)).quantize(CENT),
+                    "balance": balance,
+                }))
+                separator = b","
+            yield b"".join(chunk)
+        yield b'],"closing_balances":' + dumps(closing) + b"}"
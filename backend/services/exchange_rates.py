@@ -0,0 +1,131 @@
+import asyncio
+import csv
+import sys
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from sqlmodel import select
+
+from database import async_session, dialect_insert, init_db
+from models import ExchangeRate
+from core.config import settings
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Rate rows per upsert statement when loading a file
+LOAD_CHUNK_SIZE = 1000
+
+
+class ExchangeRateTable:
+    """
+    In-memory copy of the exchange_rates table, indexed by currency and date.
+
+    Lookups are a bisect over one currency's sorted rate dates and never touch
+    the database; the whole table is reloaded at most every `ttl` seconds, or
+    right away after new rates are loaded in this process.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # currency -> (sorted rate dates, rates)
+        self._rates: Dict[str, Tuple[List[date], List[Decimal]]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    async def refresh(self) -> None:
+        """Reload the table if it is older than the TTL."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            async with async_session() as db:
+                result = await db.execute(
+                    select(ExchangeRate.currency, ExchangeRate.rate_date, ExchangeRate.rate)
+                    .order_by(ExchangeRate.currency, ExchangeRate.rate_date)
+                )
+                rows = result.all()
+            
+            rates = defaultdict(lambda: ([], []))
+            for currency, rate_date, rate in rows:
+                dates, values = rates[currency]
+                dates.append(rate_date)
+                values.append(Decimal(str(rate)))
+            self._rates = dict(rates)
+            self._loaded_at = time.monotonic()
+
+    def rate(self, currency: str, on: date) -> Optional[Decimal]:
+        """
+        Base-currency value of one unit of `currency` on a date.
+
+        Uses the latest rate on or before the date; None if there is none.
+        """
+        if currency == settings.BASE_CURRENCY:
+            return Decimal("1")
+        if currency not in self._rates:
+            return None
+        dates, values = self._rates[currency]
+        index = bisect_right(dates, on) - 1
+        return values[index] if index >= 0 else None
+
+
+exchange_rates = ExchangeRateTable(settings.EXCHANGE_RATES_TTL_SECONDS)
+
+
+async def load_exchange_rates(path: str) -> int:
+    """
+    Upsert rates from a CSV file with `date,currency,rate` columns.
+
+    Rates are base-currency units per unit of `currency`; a row for an
+    existing (currency, date) replaces its rate. Returns the rows loaded.
+    """
+    with open(path, newline="") as f:
+        rows = [
+            {
+                "currency": row["currency"].strip().upper(),
+                "rate_date": date.fromisoformat(row["date"].strip()),
+                "rate": Decimal(row["rate"].strip()),
+            }
+            for row in csv.DictReader(f)
+        ]
+    
+    async with async_session() as db:
+        for offset in range(0, len(rows), LOAD_CHUNK_SIZE):
+            stmt = dialect_insert(ExchangeRate)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["currency", "rate_date"],
+                set_={"rate": stmt.excluded.rate},
+            )
+            await db.execute(stmt, rows[offset:offset + LOAD_CHUNK_SIZE])
+        await db.commit()
+    
+    exchange_rates.invalidate()
+    logger.info("Loaded %d exchange rates from %s", len(rows), path)
+    return len(rows)
+
+
+async def init_exchange_rates() -> None:
+    """Load EXCHANGE_RATES_FILE, when configured, at startup."""
+    if not settings.EXCHANGE_RATES_FILE:
+        return
+    if not Path(settings.EXCHANGE_RATES_FILE).exists():
+        logger.warning("Exchange rates file %s not found", settings.EXCHANGE_RATES_FILE)
+        return
+    await load_exchange_rates(settings.EXCHANGE_RATES_FILE)
+
+
+if __name__ == "__main__":
+    # Load a rates file: python -m services.exchange_rates rates.csv
+    async def main():
+        await init_db()
+        await load_exchange_rates(sys.argv[1])
+    
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+import asyncio
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional
+from sqlalchemy import func, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import async_session, init_db
+from models import Invoice, InvoiceStatus, Payment
+from core.logging import get_logger
+from services.invoice_summary import summary_key, new_deltas, add_invoice, apply_summary_deltas
+
+logger = get_logger(__name__)
+
+# Invoices checked per reconciliation query
+RECONCILE_BATCH_SIZE = 5000
+
+
+def settled_status(invoice: Invoice) -> InvoiceStatus:
+    """Status an invoice should have after its balance changed."""
+    if invoice.balance_due <= 0 and invoice.status in (InvoiceStatus.SENT, InvoiceStatus.OVERDUE):
+        return InvoiceStatus.PAID
+    if invoice.balance_due > 0 and invoice.status == InvoiceStatus.PAID:
+        return InvoiceStatus.OVERDUE if invoice.due_date < date.today() else InvoiceStatus.SENT
+    return invoice.status
+
+
+async def apply_payment_change(db: AsyncSession, invoice_id: int, amount: Decimal) -> Optional[Invoice]:
+    """
+    Add `amount` (negative to reverse) to an invoice's amount_paid in the caller's transaction.
+
+    The balance is moved by a single UPDATE ... SET amount_paid = amount_paid
+    + :amount, so concurrent payments never overwrite each other. That UPDATE
+    also holds the row (the database on SQLite) until the caller commits, so
+    the status it returns is still current when the PAID transition and the
+    summary buckets are derived from it. Returns None if the invoice is gone.
+    """
+    result = await db.execute(
+        update(Invoice)
+        .where(Invoice.id == invoice_id)
+        .values(
+            amount_paid=Invoice.amount_paid + amount,
+            balance_due=Invoice.total - (Invoice.amount_paid + amount),
+            updated_at=datetime.utcnow(),
+        )
+        .returning(Invoice)
+        .execution_options(populate_existing=True)
+    )
+    invoice = result.scalar_one_or_none()
+    if invoice is None:
+        return None
+    
+    # The UPDATE left status alone, so this is the bucket before the payment
+    old_key, old_paid = summary_key(invoice), invoice.amount_paid - amount
+    status = settled_status(invoice)
+    if status != invoice.status:
+        invoice.status = status
+        db.add(invoice)
+    
+    deltas = new_deltas()
+    add_invoice(deltas, old_key, invoice.total, old_paid, sign=-1)
+    add_invoice(deltas, summary_key(invoice), invoice.total, invoice.amount_paid)
+    await apply_summary_deltas(db, deltas)
+    return invoice
+
+
+async def balances_need_backfill(db: AsyncSession) -> bool:
+    """
+    True when some invoice's balance_due disagrees with its total and amount_paid.
+
+    That is the state of invoices written before the balance columns existed,
+    which start with both at 0.
+    """
+    result = await db.execute(
+        select(Invoice.id)
+        .where(Invoice.balance_due != Invoice.total - Invoice.amount_paid)
+        .limit(1)
+    )
+    return result.first() is not None
+
+
+async def reconcile_invoice_balances(fix: bool = False, batch_size: int = RECONCILE_BATCH_SIZE) -> List[dict]:
+    """
+    Compare every invoice's amount_paid/balance_due with its payments, in bulk.
+
+    Invoices are walked in id ranges; each range is checked with a single
+    LEFT JOIN against per-invoice payment sums, which only returns rows that
+    disagree. With fix=True those rows are corrected, a PAID transition is
+    applied where the corrected balance calls for one, and their summary
+    buckets move with them. Returns the mismatches found.
+    """
+    mismatches = []
+    async with async_session() as db:
+        max_id = (await db.execute(select(func.max(Invoice.id)))).scalar_one() or 0
+        
+        for low in range(0, max_id, batch_size):
+            high = low + batch_size
+            paid = (
+                select(Payment.invoice_id, func.sum(Payment.amount).label("paid"))
+                .where(Payment.invoice_id > low, Payment.invoice_id <= high)
+                .group_by(Payment.invoice_id)
+                .subquery()
+            )
+            expected_paid = func.coalesce(paid.c.paid, 0)
+            result = await db.execute(
+                select(Invoice, expected_paid)
+                .outerjoin(paid, paid.c.invoice_id == Invoice.id)
+                .where(
+                    Invoice.id > low,
+                    Invoice.id <= high,
+                    (Invoice.amount_paid != expected_paid)
+                    | (Invoice.balance_due != Invoice.total - expected_paid)
+                )
+            )
+            
+            deltas = new_deltas()
+            for invoice, expected in result.all():
+                expected = Decimal(str(expected))
+                mismatches.append({
+                    "invoice_id": invoice.id,
+                    "amount_paid": invoice.amount_paid,
+                    "expected_amount_paid": expected,
+                    "balance_due": invoice.balance_due,
+                    "expected_balance_due": invoice.total - expected,
+                })
+                if fix:
+                    old_key, old_paid = summary_key(invoice), invoice.amount_paid
+                    invoice.amount_paid = expected
+                    invoice.balance_due = invoice.total - expected
+                    invoice.status = settled_status(invoice)
+                    invoice.updated_at = datetime.utcnow()
+                    db.add(invoice)
+                    add_invoice(deltas, old_key, invoice.total, old_paid, sign=-1)
+                    add_invoice(deltas, summary_key(invoice), invoice.total, invoice.amount_paid)
+            
+            if fix and deltas:
+                await apply_summary_deltas(db, deltas)
+                await db.commit()
+    
+    logger.info("Balance reconciliation found %d mismatched invoices", len(mismatches))
+    return mismatches
+
+
+if __name__ == "__main__":
+    # python -m services.invoice_balance [--fix]
+    async def main():
+        await init_db()
+        for mismatch in await reconcile_invoice_balances(fix="--fix" in sys.argv):
+            print(mismatch)
+
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+from models import Invoice, InvoiceItem
+from schemas import InvoiceCreate
+from core.config import settings
+
+CENT = Decimal("0.01")
+
+
+def calculate_invoice_totals(invoice: Invoice, items: List[InvoiceItem]) -> None:
+    """
+    Calculate invoice totals based on items.
+
+    Every amount is rounded to cents as it is computed, so the invoice in
+    memory matches what is stored and the total is the sum of its parts.
+    """
+    subtotal = sum((item.amount for item in items), Decimal("0.00")).quantize(CENT)
+    invoice.subtotal = subtotal
+    invoice.discount_amount = invoice.discount_amount.quantize(CENT)
+    invoice.tax_amount = (subtotal * (invoice.tax_rate / Decimal("100"))).quantize(CENT)
+    invoice.total = (subtotal + invoice.tax_amount - invoice.discount_amount).quantize(CENT)
+    invoice.balance_due = (invoice.total - invoice.amount_paid).quantize(CENT)
+
+
+def build_invoice(
+    invoice_in: InvoiceCreate,
+    user_id: int,
+    invoice_number: str,
+    issue_date: Optional[date] = None,
+) -> Invoice:
+    """Build an unsaved invoice with its items and totals from the request payload."""
+    invoice = Invoice(
+        user_id=user_id,
+        client_id=invoice_in.client_id,
+        invoice_number=invoice_number,
+        due_date=invoice_in.due_date,
+        currency=invoice_in.currency or settings.BASE_CURRENCY,
+        tax_rate=invoice_in.tax_rate,
+        discount_amount=invoice_in.discount_amount,
+        notes=invoice_in.notes,
+        terms=invoice_in.terms
+    )
+    if issue_date is not None:
+        invoice.issue_date = issue_date
+    
+    # Create invoice items
+    items = []
+    for item_in in invoice_in.items:
+        amount = (item_in.quantity * item_in.unit_price).quantize(CENT)
+        item = InvoiceItem(
+            description=item_in.description,
+            quantity=item_in.quantity,
+            unit_price=item_in.unit_price,
+            amount=amount
+        )
+        items.append(item)
+    
+    # Calculate totals
+    calculate_invoice_totals(invoice, items)
+    invoice.items = items
+    return invoice
@@ -0,0 +1,84 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import update
+
+from database import engine, dialect_insert
+from models import InvoiceNumberSequence
+from core.config import settings
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class InvoiceNumberAllocator:
+    """
+    Hand out invoice numbers per (user, series) without per-invoice contention.
+
+    Numbers are reserved from the `invoice_number_sequences` counter table in
+    blocks with a single atomic UPDATE ... RETURNING, then handed out from an
+    in-process cache, so most allocations never touch the database. Every
+    process reserves its own blocks, so numbers are unique across workers and
+    nodes; unused numbers of a block are skipped when the process exits.
+    """
+
+    def __init__(self, number_format: str, block_size: int):
+        self.number_format = number_format
+        self.block_size = block_size
+        # (user_id, series) -> [next, end) of the currently reserved block
+        self._blocks: Dict[Tuple[int, str], List[int]] = {}
+        self._locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+
+    def format(self, user_id: int, series: str, number: int) -> str:
+        """Render a sequence value with the configured format."""
+        return self.number_format.format(user_id=user_id, series=series, number=number)
+
+    async def allocate(self, user_id: int, count: int = 1, series: Optional[str] = None) -> List[str]:
+        """Allocate `count` unique invoice numbers for a user in the given series."""
+        series = series or settings.INVOICE_NUMBER_SERIES
+        key = (user_id, series)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        
+        numbers = []
+        async with lock:
+            block = self._blocks.get(key)
+            while len(numbers) < count:
+                if block is None or block[0] >= block[1]:
+                    # Reserve enough for the whole request in one round trip
+                    block = await self._reserve(user_id, series, max(count - len(numbers), self.block_size))
+                    self._blocks[key] = block
+                take = min(count - len(numbers), block[1] - block[0])
+                numbers.extend(range(block[0], block[0] + take))
+                block[0] += take
+        
+        return [self.format(user_id, series, number) for number in numbers]
+
+    async def _reserve(self, user_id: int, series: str, size: int) -> List[int]:
+        """Atomically reserve `size` numbers from the counter table."""
+        bump = (
+            update(InvoiceNumberSequence)
+            .where(
+                InvoiceNumberSequence.user_id == user_id,
+                InvoiceNumberSequence.series == series
+            )
+            .values(next_value=InvoiceNumberSequence.next_value + size)
+            .returning(InvoiceNumberSequence.next_value)
+        )
+        async with engine.begin() as conn:
+            end = (await conn.execute(bump)).scalar_one_or_none()
+            if end is None:
+                # First allocation for this series; concurrent creators are ignored
+                await conn.execute(
+                    dialect_insert(InvoiceNumberSequence)
+                    .values(user_id=user_id, series=series, next_value=1)
+                    .on_conflict_do_nothing()
+                )
+                end = (await conn.execute(bump)).scalar_one()
+        
+        logger.debug("Reserved invoice numbers %d..%d for user %d series %s", end - size, end - 1, user_id, series)
+        return [end - size, end]
+
+
+invoice_number_allocator = InvoiceNumberAllocator(
+    number_format=settings.INVOICE_NUMBER_FORMAT,
+    block_size=settings.INVOICE_NUMBER_BLOCK_SIZE,
+)
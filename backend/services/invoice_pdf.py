@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from core.config import settings
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the template or its styling changes so cached PDFs are re-rendered
+TEMPLATE_VERSION = "2"
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+_templates = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+)
+
+# Created on first use so importing the module does not fork workers
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def render_invoice_html(invoice, items, client, user) -> str:
+    """Render the invoice template; cheap enough to run on the event loop."""
+    template = _templates.get_template("invoice.html")
+    return template.render(invoice=invoice, items=items, client=client, user=user)
+
+
+def pdf_cache_path(html: str) -> Path:
+    """Cache file for a rendered document, addressed by its content."""
+    digest = hashlib.sha256(f"{TEMPLATE_VERSION}\0{html}".encode()).hexdigest()
+    return Path(settings.PDF_CACHE_DIR) / digest[:2] / f"{digest}.pdf"
+
+
+def _render_pdf(html: str) -> bytes:
+    # Runs in a worker process; WeasyPrint is only needed where PDFs are rendered
+    from weasyprint import HTML
+
+    return HTML(string=html, base_url=str(TEMPLATES_DIR)).write_pdf()
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=settings.PDF_RENDER_WORKERS)
+    return _render_pool
+
+
+async def get_invoice_pdf(html: str) -> Path:
+    """
+    Return the path of the PDF for rendered invoice HTML.
+
+    Unchanged invoices are served from the cache; otherwise the PDF is rendered
+    in the process pool and written to the cache atomically, so concurrent
+    requests for the same invoice at worst render it twice.
+    """
+    path = pdf_cache_path(html)
+    if path.exists():
+        return path
+    
+    loop = asyncio.get_running_loop()
+    pdf = await loop.run_in_executor(_get_render_pool(), _render_pdf, html)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(pdf)
+    os.replace(tmp_path, path)
+    logger.debug("Rendered PDF %s", path.name)
+    return path
+
+
+async def get_invoice_pdfs(documents: List[str]) -> List[Path]:
+    """Render many invoices concurrently; the pool spreads them across cores."""
+    return list(await asyncio.gather(*(get_invoice_pdf(html) for html in documents)))
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
@@ -0,0 +1,192 @@
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import dialect_insert
+from models import Invoice, InvoiceStatus, InvoiceSummary
+from core.config import settings
+from services.exchange_rates import exchange_rates
+from services.aging_report import mark_aging_reports_stale
+
+# (user_id, client_id, status, "YYYY-MM", currency)
+SummaryKey = Tuple[int, int, InvoiceStatus, str, str]
+
+# key -> [invoice_count, total, amount_paid]
+SummaryDeltas = Dict[SummaryKey, List]
+
+CENT = Decimal("0.01")
+
+# Statuses whose unpaid remainder counts as outstanding
+OPEN_STATUSES = (InvoiceStatus.SENT, InvoiceStatus.OVERDUE)
+
+
+def new_deltas() -> SummaryDeltas:
+    return defaultdict(lambda: [0, Decimal("0.00"), Decimal("0.00")])
+
+
+def summary_key(invoice: Invoice) -> SummaryKey:
+    """The summary bucket an invoice is counted in."""
+    return (
+        invoice.user_id, invoice.client_id, invoice.status,
+        invoice.issue_date.strftime("%Y-%m"), invoice.currency,
+    )
+
+
+def add_invoice(deltas: SummaryDeltas, key: SummaryKey, total: Decimal, amount_paid: Decimal, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) one invoice to/from a bucket."""
+    delta = deltas[key]
+    delta[0] += sign
+    delta[1] += sign * total
+    delta[2] += sign * amount_paid
+
+
+async def apply_summary_deltas(db: AsyncSession, deltas: SummaryDeltas) -> None:
+    """
+    Upsert bucket deltas into invoice_summaries with one statement.
+
+    Runs in the caller's transaction so summaries commit atomically with the
+    invoice or payment change that produced them. The cached aging reports of
+    the users concerned are dropped once that transaction commits.
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "client_id": client_id,
+            "status": status,
+            "month": month,
+            "currency": currency,
+            "invoice_count": count,
+            "total": total,
+            "amount_paid": amount_paid,
+        }
+        for (user_id, client_id, status, month, currency), (count, total, amount_paid) in deltas.items()
+        if count or total or amount_paid
+    ]
+    if not rows:
+        return
+    
+    stmt = dialect_insert(InvoiceSummary)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "client_id", "status", "month", "currency"],
+        set_={
+            "invoice_count": InvoiceSummary.invoice_count + stmt.excluded.invoice_count,
+            "total": InvoiceSummary.total + stmt.excluded.total,
+            "amount_paid": InvoiceSummary.amount_paid + stmt.excluded.amount_paid,
+        },
+    )
+    await db.execute(stmt, rows)
+    mark_aging_reports_stale(db, (row["user_id"] for row in rows))
+
+
+async def rebuild_invoice_summaries(db: AsyncSession) -> None:
+    """
+    Recompute every summary bucket from invoices.
+
+    Only needed to backfill data written before the summary table existed.
+    """
+    result = await db.execute(
+        select(
+            Invoice.user_id,
+            Invoice.client_id,
+            Invoice.status,
+            Invoice.issue_date,
+            Invoice.currency,
+            func.count(),
+            func.sum(Invoice.total),
+            func.sum(Invoice.amount_paid),
+        )
+        .group_by(Invoice.user_id, Invoice.client_id, Invoice.status, Invoice.issue_date, Invoice.currency)
+    )
+    
+    deltas = new_deltas()
+    for user_id, client_id, status, issue_date, currency, count, total, amount_paid in result.all():
+        delta = deltas[(user_id, client_id, status, issue_date.strftime("%Y-%m"), currency)]
+        delta[0] += count
+        delta[1] += Decimal(str(total))
+        delta[2] += Decimal(str(amount_paid))
+    
+    await db.execute(InvoiceSummary.__table__.delete())
+    await apply_summary_deltas(db, deltas)
+    await db.commit()
+
+
+async def summaries_need_rebuild(db: AsyncSession) -> bool:
+    """True when invoices exist but no summary rows do (pre-existing data)."""
+    has_summary = await db.execute(select(InvoiceSummary.id).limit(1))
+    if has_summary.first() is not None:
+        return False
+    has_invoice = await db.execute(select(Invoice.id).limit(1))
+    return has_invoice.first() is not None
+
+
+def _month_end(month: str) -> date:
+    year, month_number = int(month[:4]), int(month[5:7])
+    return date(year, month_number, monthrange(year, month_number)[1])
+
+
+async def get_user_summary(db: AsyncSession, user_id: int) -> dict:
+    """
+    Dashboard totals for a user, overall and by status, month, client and currency.
+
+    Reads only the user's pre-aggregated buckets, so the cost depends on the
+    number of (client, status, month, currency) combinations, not on invoice
+    history. Buckets are converted to BASE_CURRENCY at the rate of their
+    month's end, looked up once per (currency, month) in the in-memory rate
+    table; by_currency keeps the original amounts. Buckets in a currency
+    without a rate are left out of the converted totals and listed in
+    unconverted_currencies.
+    """
+    result = await db.execute(
+        select(InvoiceSummary).where(
+            InvoiceSummary.user_id == user_id,
+            InvoiceSummary.invoice_count > 0
+        )
+    )
+    await exchange_rates.refresh()
+    
+    def group() -> dict:
+        return {"invoice_count": 0, "total": Decimal("0.00"), "amount_paid": Decimal("0.00"), "outstanding": Decimal("0.00")}
+    
+    def add(bucket: dict, count: int, total: Decimal, amount_paid: Decimal, outstanding: Decimal) -> None:
+        bucket["invoice_count"] += count
+        bucket["total"] += total
+        bucket["amount_paid"] += amount_paid
+        bucket["outstanding"] += outstanding
+    
+    overall = {**group(), "overdue": Decimal("0.00")}
+    by_status, by_month, by_client, by_currency = defaultdict(group), defaultdict(group), defaultdict(group), defaultdict(group)
+    rates, unconverted = {}, set()
+    for row in result.scalars().all():
+        outstanding = row.total - row.amount_paid if row.status in OPEN_STATUSES else Decimal("0.00")
+        add(by_currency[row.currency], row.invoice_count, row.total, row.amount_paid, outstanding)
+        
+        rate_key = (row.currency, row.month)
+        if rate_key not in rates:
+            rates[rate_key] = exchange_rates.rate(row.currency, _month_end(row.month))
+        rate = rates[rate_key]
+        if rate is None:
+            unconverted.add(row.currency)
+            continue
+        total, amount_paid, outstanding = row.total * rate, row.amount_paid * rate, outstanding * rate
+        for bucket in (overall, by_status[row.status], by_month[row.month], by_client[row.client_id]):
+            add(bucket, row.invoice_count, total, amount_paid, outstanding)
+        if row.status == InvoiceStatus.OVERDUE:
+            overall["overdue"] += outstanding
+    
+    def rounded(values: dict) -> dict:
+        return {key: value.quantize(CENT) if isinstance(value, Decimal) else value for key, value in values.items()}
+    
+    return {
+        "currency": settings.BASE_CURRENCY,
+        "unconverted_currencies": sorted(unconverted),
+        **rounded(overall),
+        "by_status": [{"status": key, **rounded(values)} for key, values in by_status.items()],
+        "by_month": [{"month": key, **rounded(values)} for key, values in sorted(by_month.items())],
+        "by_client": [{"client_id": key, **rounded(values)} for key, values in by_client.items()],
+        "by_currency": [{"currency": key, **rounded(values)} for key, values in sorted(by_currency.items())],
+    }
@@ -0,0 +1,104 @@
+import asyncio
+import sys
+import time
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import update
+from sqlmodel import select
+
+from database import async_session, init_db
+from models import Invoice, InvoiceStatus
+from core.config import settings
+from core.logging import get_logger
+from core.metrics import metrics
+from services.invoice_summary import new_deltas, add_invoice, apply_summary_deltas
+
+logger = get_logger(__name__)
+
+
+async def sweep_overdue_invoices(batch_size: Optional[int] = None, today: Optional[date] = None) -> int:
+    """
+    Move SENT invoices past their due date to OVERDUE, one batch per transaction.
+
+    Each batch is picked through the (status, due_date) index and updated with
+    a guarded UPDATE ... RETURNING, so only rows this run actually changed are
+    counted. On Postgres candidate rows are locked with SKIP LOCKED, so several
+    nodes sweeping at once work on disjoint batches; elsewhere the status guard
+    alone keeps concurrent sweeps from double-counting.
+    """
+    batch_size = batch_size or settings.OVERDUE_SWEEP_BATCH_SIZE
+    today = today or date.today()
+    swept = 0
+    start = time.perf_counter()
+    
+    while True:
+        async with async_session() as db:
+            candidates = await db.execute(
+                select(Invoice.id)
+                .where(Invoice.status == InvoiceStatus.SENT, Invoice.due_date < today)
+                .order_by(Invoice.due_date)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            invoice_ids = candidates.scalars().all()
+            if not invoice_ids:
+                break
+            
+            changed = await db.execute(
+                update(Invoice)
+                .where(Invoice.id.in_(invoice_ids), Invoice.status == InvoiceStatus.SENT)
+                .values(status=InvoiceStatus.OVERDUE, updated_at=datetime.utcnow())
+                .returning(
+                    Invoice.user_id, Invoice.client_id, Invoice.issue_date,
+                    Invoice.currency, Invoice.total, Invoice.amount_paid
+                )
+            )
+            rows = changed.all()
+            
+            deltas = new_deltas()
+            for row in rows:
+                month = row.issue_date.strftime("%Y-%m")
+                sent_key = (row.user_id, row.client_id, InvoiceStatus.SENT, month, row.currency)
+                overdue_key = (row.user_id, row.client_id, InvoiceStatus.OVERDUE, month, row.currency)
+                add_invoice(deltas, sent_key, row.total, row.amount_paid, sign=-1)
+                add_invoice(deltas, overdue_key, row.total, row.amount_paid)
+            await apply_summary_deltas(db, deltas)
+            await db.commit()
+        
+        swept += len(rows)
+        metrics.inc("overdue_sweep_invoices_total", "", len(rows))
+        if len(invoice_ids) < batch_size:
+            break
+    
+    elapsed = time.perf_counter() - start
+    if swept:
+        logger.info(
+            "Marked %d invoices overdue in %.2fs (%.0f rows/s)",
+            swept, elapsed, swept / elapsed if elapsed else 0,
+        )
+    metrics.inc("overdue_sweep_runs_total", "")
+    metrics.inc("overdue_sweep_seconds_total", "", elapsed)
+    return swept
+
+
+async def run_overdue_sweeper(interval: Optional[float] = None) -> None:
+    """Sweep forever, every `interval` seconds; errors are logged and retried."""
+    interval = interval or settings.OVERDUE_SWEEP_INTERVAL_SECONDS
+    while True:
+        try:
+            await sweep_overdue_invoices()
+        except Exception:
+            logger.exception("Overdue sweep failed")
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    # Standalone worker: python -m services.overdue_sweeper [--once]
+    async def main():
+        await init_db()
+        if "--once" in sys.argv:
+            await sweep_overdue_invoices()
+        else:
+            await run_overdue_sweeper()
+
+    asyncio.run(main())
@@ -0,0 +1,230 @@
+import asyncio
+import sys
+import time
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, NamedTuple, Optional
+from sqlalchemy import case, insert, tuple_, update
+from sqlmodel import select
+
+from database import async_session, init_db
+from models import Invoice, InvoiceItem, RecurrenceInterval, RecurringInvoice, RecurringInvoiceItem
+from schemas import InvoiceCreate, InvoiceItemCreate
+from core.config import settings
+from core.logging import get_logger
+from core.metrics import metrics
+from services.invoice_builder import build_invoice
+from services.invoice_numbers import invoice_number_allocator
+from services.invoice_summary import summary_key, new_deltas, add_invoice, apply_summary_deltas
+
+logger = get_logger(__name__)
+
+# Most invoices one template may catch up on per batch; the rest follow in later batches
+MAX_CATCH_UP = 12
+
+# Invoices per multi-row INSERT
+INSERT_CHUNK_SIZE = 500
+
+INTERVAL_MONTHS = {
+    RecurrenceInterval.MONTHLY: 1,
+    RecurrenceInterval.QUARTERLY: 3,
+    RecurrenceInterval.YEARLY: 12,
+}
+
+
+class RunPlan(NamedTuple):
+    issue_dates: List[date]
+    next_run: date
+    occurrences: int
+    is_active: bool
+
+
+def occurrence_date(template: RecurringInvoice, n: int) -> date:
+    """Issue date of a template's n-th invoice (0-based), clamped to the end of short months."""
+    start = template.start_date
+    if template.interval == RecurrenceInterval.WEEKLY:
+        return start + timedelta(weeks=template.interval_count * n)
+    months = start.month - 1 + INTERVAL_MONTHS[template.interval] * template.interval_count * n
+    year, month = start.year + months // 12, months % 12 + 1
+    return date(year, month, min(start.day, monthrange(year, month)[1]))
+
+
+def plan_run(template: RecurringInvoice, today: date) -> RunPlan:
+    """Issue dates due for a template and where its schedule moves to afterwards."""
+    issue_dates = []
+    occurrences, next_run = template.occurrences, template.next_run
+    while (
+        next_run <= today
+        and (template.end_date is None or next_run <= template.end_date)
+        and len(issue_dates) < MAX_CATCH_UP
+    ):
+        issue_dates.append(next_run)
+        occurrences += 1
+        next_run = occurrence_date(template, occurrences)
+    is_active = template.end_date is None or next_run <= template.end_date
+    return RunPlan(issue_dates, next_run, occurrences, is_active)
+
+
+async def generate_recurring_invoices(
+    batch_size: Optional[int] = None,
+    today: Optional[date] = None,
+    time_budget: Optional[float] = None,
+) -> int:
+    """
+    Generate the invoices of every due recurring template, one batch per transaction.
+
+    Due templates are picked through the (is_active, next_run) index. Each
+    batch advances the schedules with one guarded UPDATE, which only claims
+    templates whose next_run is still the value read, then inserts the
+    invoices and items of the claimed templates with chunked multi-row
+    INSERTs in the same transaction. On Postgres candidates are locked with
+    SKIP LOCKED so several workers take disjoint batches; elsewhere the
+    guard alone keeps two workers from generating the same run. Stops
+    starting new batches once `time_budget` seconds have passed.
+    """
+    batch_size = batch_size or settings.RECURRING_BATCH_SIZE
+    today = today or date.today()
+    time_budget = time_budget or settings.RECURRING_TIME_BUDGET_SECONDS
+    generated = 0
+    start = time.perf_counter()
+    
+    while True:
+        if time.perf_counter() - start > time_budget:
+            logger.warning("Recurring invoice run stopped after its %.0fs budget", time_budget)
+            break
+        
+        async with async_session() as db:
+            result = await db.execute(
+                select(RecurringInvoice)
+                .where(RecurringInvoice.is_active == True, RecurringInvoice.next_run <= today)  # noqa: E712
+                .order_by(RecurringInvoice.next_run, RecurringInvoice.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            templates = result.scalars().all()
+            if not templates:
+                break
+            plans = {template.id: plan_run(template, today) for template in templates}
+            
+            # Reserve numbers before this transaction writes: the allocator
+            # commits on its own connection, and SQLite allows one writer.
+            # Numbers of templates another worker claims first are skipped.
+            counts = defaultdict(int)
+            for template in templates:
+                counts[template.user_id] += len(plans[template.id].issue_dates)
+            numbers = {
+                user_id: iter(await invoice_number_allocator.allocate(user_id, count=count))
+                for user_id, count in counts.items() if count
+            }
+            
+            template_id = RecurringInvoice.id
+            values = {
+                "next_run": case({tid: plan.next_run for tid, plan in plans.items()}, value=template_id),
+                "occurrences": case({tid: plan.occurrences for tid, plan in plans.items()}, value=template_id),
+                "is_active": case({tid: plan.is_active for tid, plan in plans.items()}, value=template_id),
+                "updated_at": datetime.utcnow(),
+            }
+            # Templates past their end date only get deactivated; a CASE needs at least one WHEN
+            last_runs = {tid: plan.issue_dates[-1] for tid, plan in plans.items() if plan.issue_dates}
+            if last_runs:
+                values["last_run"] = case(last_runs, value=template_id, else_=RecurringInvoice.last_run)
+            claimed = await db.execute(
+                update(RecurringInvoice)
+                .where(tuple_(RecurringInvoice.id, RecurringInvoice.next_run).in_(
+                    [(template.id, template.next_run) for template in templates]
+                ))
+                .values(**values)
+                .returning(RecurringInvoice.id)
+                .execution_options(synchronize_session=False)
+            )
+            claimed_ids = set(claimed.scalars().all())
+            
+            items = await db.execute(
+                select(RecurringInvoiceItem)
+                .where(RecurringInvoiceItem.template_id.in_(claimed_ids))
+                .order_by(RecurringInvoiceItem.template_id, RecurringInvoiceItem.id)
+            )
+            items_by_template = defaultdict(list)
+            for item in items.scalars().all():
+                items_by_template[item.template_id].append(InvoiceItemCreate.model_construct(
+                    description=item.description, quantity=item.quantity, unit_price=item.unit_price
+                ))
+            
+            invoices = []
+            for template in templates:
+                if template.id not in claimed_ids:
+                    continue
+                for issue_date in plans[template.id].issue_dates:
+                    invoice_in = InvoiceCreate.model_construct(
+                        client_id=template.client_id,
+                        due_date=issue_date + timedelta(days=template.payment_terms_days),
+                        currency=template.currency,
+                        tax_rate=template.tax_rate,
+                        discount_amount=template.discount_amount,
+                        notes=template.notes,
+                        terms=template.terms,
+                        items=items_by_template[template.id],
+                    )
+                    invoices.append(build_invoice(
+                        invoice_in, template.user_id, next(numbers[template.user_id]), issue_date
+                    ))
+            
+            deltas = new_deltas()
+            for offset in range(0, len(invoices), INSERT_CHUNK_SIZE):
+                chunk = invoices[offset:offset + INSERT_CHUNK_SIZE]
+                inserted = await db.execute(
+                    insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+                    [invoice.model_dump(exclude={"id"}) for invoice in chunk]
+                )
+                item_rows = []
+                for invoice, invoice_id in zip(chunk, inserted.scalars().all()):
+                    add_invoice(deltas, summary_key(invoice), invoice.total, Decimal("0.00"))
+                    for item in invoice.items:
+                        item_rows.append({**item.model_dump(exclude={"id"}), "invoice_id": invoice_id})
+                if item_rows:
+                    await db.execute(insert(InvoiceItem), item_rows)
+            await apply_summary_deltas(db, deltas)
+            await db.commit()
+        
+        generated += len(invoices)
+        metrics.inc("recurring_invoices_generated_total", "", len(invoices))
+        # Templates capped at MAX_CATCH_UP are still due and go in the next batch
+        if len(templates) < batch_size and not any(
+            plan.is_active and plan.next_run <= today for plan in plans.values()
+        ):
+            break
+    
+    elapsed = time.perf_counter() - start
+    if generated:
+        logger.info(
+            "Generated %d recurring invoices in %.2fs (%.0f invoices/s)",
+            generated, elapsed, generated / elapsed if elapsed else 0,
+        )
+    metrics.inc("recurring_runs_total", "")
+    metrics.inc("recurring_seconds_total", "", elapsed)
+    return generated
+
+
+async def run_recurring_generator(interval: Optional[float] = None) -> None:
+    """Generate due invoices forever, every `interval` seconds; errors are logged and retried."""
+    interval = interval or settings.RECURRING_INTERVAL_SECONDS
+    while True:
+        try:
+            await generate_recurring_invoices()
+        except Exception:
+            logger.exception("Recurring invoice generation failed")
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    # Standalone worker: python -m services.recurring_invoices [--once]
+    async def main():
+        await init_db()
+        if "--once" in sys.argv:
+            await generate_recurring_invoices()
+        else:
+            await run_recurring_generator()
+    
+    asyncio.run(main())
@@ -0,0 +1,234 @@
+import re
+from functools import lru_cache
+from typing import List
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import engine, USE_SQLITE
+from models import Client, Invoice
+
+# Searchable text per document; the Postgres GIN indexes are built on exactly
+# these expressions so the search query can use them
+CLIENT_DOCUMENT = "coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(tax_id, '')"
+INVOICE_DOCUMENT = "coalesce(invoice_number, '') || ' ' || coalesce(notes, '')"
+ITEM_DOCUMENT = "coalesce(description, '')"
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_clients_search ON clients USING gin (to_tsvector('simple', {CLIENT_DOCUMENT}))",
+    f"CREATE INDEX IF NOT EXISTS ix_invoices_search ON invoices USING gin (to_tsvector('simple', {INVOICE_DOCUMENT}))",
+    f"CREATE INDEX IF NOT EXISTS ix_invoice_items_search ON invoice_items USING gin (to_tsvector('simple', {ITEM_DOCUMENT}))",
+]
+
+# Longer queries are cut to their first MAX_SEARCH_TERMS terms
+MAX_SEARCH_TERMS = 8
+
+# Documents a term can hit, as (kind, ref_id, document, FROM clause, user_id column).
+# Item hits count for their invoice.
+POSTGRES_SOURCES = [
+    ("'client'", "clients.id", CLIENT_DOCUMENT, "clients", "clients.user_id"),
+    ("'invoice'", "invoices.id", INVOICE_DOCUMENT, "invoices", "invoices.user_id"),
+    (
+        "'invoice'", "invoice_items.invoice_id", ITEM_DOCUMENT,
+        "invoice_items JOIN invoices ON invoices.id = invoice_items.invoice_id", "invoices.user_id",
+    ),
+]
+
+
+@lru_cache
+def _postgres_search(term_count: int):
+    """
+    Search query for `term_count` terms, bound as :term_0, :term_1, ...
+
+    Each term is matched on its own and hits are grouped by client or
+    invoice, so a term found in an item and another in the invoice number
+    both count towards the invoice.
+    """
+    hits = " UNION ALL ".join(
+        f"SELECT {term} AS term, {kind} AS kind, {ref_id} AS ref_id, "
+        f"ts_rank(to_tsvector('simple', {document}), to_tsquery('simple', :term_{term})) AS rank "
+        f"FROM {source} WHERE {user_id} = :user_id "
+        f"AND to_tsvector('simple', {document}) @@ to_tsquery('simple', :term_{term})"
+        for term in range(term_count)
+        for kind, ref_id, document, source, user_id in POSTGRES_SOURCES
+    )
+    return text(f"""
+        WITH hits AS ({hits}),
+        term_hits AS (
+            SELECT kind, ref_id, term, max(rank) AS rank
+            FROM hits
+            GROUP BY kind, ref_id, term
+        )
+        SELECT kind, ref_id, sum(rank) AS rank
+        FROM term_hits
+        GROUP BY kind, ref_id
+        HAVING count(*) = {term_count}
+        ORDER BY rank DESC, kind, ref_id
+        LIMIT :limit OFFSET :offset
+    """)
+
+
+# FTS5 index kept in sync by triggers. rowid = source id * 4 + kind code, so
+# a trigger can replace a document by rowid without scanning the index.
+# Item hits are indexed under their invoice.
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        user_id, kind UNINDEXED, ref_id UNINDEXED, body, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS clients_search_insert AFTER INSERT ON clients BEGIN
+        INSERT INTO search_index (rowid, user_id, kind, ref_id, body)
+        VALUES (NEW.id * 4 + 1, NEW.user_id, 'client', NEW.id, {CLIENT_DOCUMENT.replace("coalesce(", "coalesce(NEW.")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS clients_search_update AFTER UPDATE OF name, email, tax_id ON clients BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + 1;
+        INSERT INTO search_index (rowid, user_id, kind, ref_id, body)
+        VALUES (NEW.id * 4 + 1, NEW.user_id, 'client', NEW.id, {CLIENT_DOCUMENT.replace("coalesce(", "coalesce(NEW.")});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS clients_search_delete AFTER DELETE ON clients BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS invoices_search_insert AFTER INSERT ON invoices BEGIN
+        INSERT INTO search_index (rowid, user_id, kind, ref_id, body)
+        VALUES (NEW.id * 4 + 2, NEW.user_id, 'invoice', NEW.id, {INVOICE_DOCUMENT.replace("coalesce(", "coalesce(NEW.")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS invoices_search_update AFTER UPDATE OF invoice_number, notes ON invoices BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + 2;
+        INSERT INTO search_index (rowid, user_id, kind, ref_id, body)
+        VALUES (NEW.id * 4 + 2, NEW.user_id, 'invoice', NEW.id, {INVOICE_DOCUMENT.replace("coalesce(", "coalesce(NEW.")});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS invoices_search_delete AFTER DELETE ON invoices BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + 2;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS invoice_items_search_insert AFTER INSERT ON invoice_items BEGIN
+        INSERT INTO search_index (rowid, user_id, kind, ref_id, body)
+        SELECT NEW.id * 4 + 3, user_id, 'invoice', NEW.invoice_id, {ITEM_DOCUMENT.replace("coalesce(", "coalesce(NEW.")}
+        FROM invoices WHERE id = NEW.invoice_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS invoice_items_search_update AFTER UPDATE OF description ON invoice_items BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + 3;
+        INSERT INTO search_index (rowid, user_id, kind, ref_id, body)
+        SELECT NEW.id * 4 + 3, user_id, 'invoice', NEW.invoice_id, {ITEM_DOCUMENT.replace("coalesce(", "coalesce(NEW.")}
+        FROM invoices WHERE id = NEW.invoice_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS invoice_items_search_delete AFTER DELETE ON invoice_items BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + 3;
+    END
+    """,
+]
+
+# Indexes rows written before the FTS table existed
+SQLITE_BACKFILL = [
+    f"INSERT INTO search_index (rowid, user_id, kind, ref_id, body) SELECT id * 4 + 1, user_id, 'client', id, {CLIENT_DOCUMENT} FROM clients",
+    f"INSERT INTO search_index (rowid, user_id, kind, ref_id, body) SELECT id * 4 + 2, user_id, 'invoice', id, {INVOICE_DOCUMENT} FROM invoices",
+    f"""
+    INSERT INTO search_index (rowid, user_id, kind, ref_id, body)
+    SELECT invoice_items.id * 4 + 3, invoices.user_id, 'invoice', invoice_items.invoice_id, {ITEM_DOCUMENT}
+    FROM invoice_items JOIN invoices ON invoices.id = invoice_items.invoice_id
+    """,
+]
+
+@lru_cache
+def _sqlite_search(term_count: int):
+    """Search query for `term_count` terms, bound as :term_0, :term_1, ...; see _postgres_search."""
+    hits = " UNION ALL ".join(
+        f"SELECT {term} AS term, kind, ref_id, bm25(search_index) AS score "
+        f"FROM search_index WHERE search_index MATCH :term_{term}"
+        for term in range(term_count)
+    )
+    return text(f"""
+        WITH hits AS MATERIALIZED ({hits}),
+        term_hits AS (
+            SELECT kind, ref_id, term, min(score) AS score
+            FROM hits
+            GROUP BY kind, ref_id, term
+        )
+        SELECT kind, ref_id, sum(score) AS rank
+        FROM term_hits
+        GROUP BY kind, ref_id
+        HAVING count(*) = {term_count}
+        ORDER BY rank, kind, ref_id
+        LIMIT :limit OFFSET :offset
+    """)
+
+
+async def init_search() -> None:
+    """Create the full-text indexes for the active database backend."""
+    async with engine.begin() as conn:
+        if not USE_SQLITE:
+            for statement in POSTGRES_DDL:
+                await conn.execute(text(statement))
+            return
+        
+        existed = (await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'search_index'")
+        )).first() is not None
+        for statement in SQLITE_DDL:
+            await conn.execute(text(statement))
+        if not existed:
+            for statement in SQLITE_BACKFILL:
+                await conn.execute(text(statement))
+
+
+def _terms(query: str) -> List[str]:
+    """Split free text into word terms, dropping any query syntax."""
+    return re.findall(r"\w+", query.lower())
+
+
+async def search(db: AsyncSession, user_id: int, query: str, limit: int, offset: int) -> List[dict]:
+    """
+    Ranked prefix search over the user's clients and invoices.
+
+    Every term must prefix-match a word of the client, or of the invoice
+    or one of its items. Returns dicts with kind ("client" or "invoice"),
+    id, title and rank (higher is better).
+    """
+    terms = _terms(query)[:MAX_SEARCH_TERMS]
+    if not terms:
+        return []
+    
+    params = {"limit": limit, "offset": offset}
+    if USE_SQLITE:
+        params.update({
+            f"term_{index}": f'user_id:"{user_id}" AND body:"{term}"*' for index, term in enumerate(terms)
+        })
+        result = await db.execute(_sqlite_search(len(terms)), params)
+        # bm25() is lower-is-better
+        hits = [(kind, ref_id, -rank) for kind, ref_id, rank in result.all()]
+    else:
+        params.update({f"term_{index}": f"{term}:*" for index, term in enumerate(terms)}, user_id=user_id)
+        result = await db.execute(_postgres_search(len(terms)), params)
+        hits = result.all()
+    
+    client_ids = [ref_id for kind, ref_id, _ in hits if kind == "client"]
+    invoice_ids = [ref_id for kind, ref_id, _ in hits if kind == "invoice"]
+    titles = {}
+    if client_ids:
+        rows = await db.execute(select(Client.id, Client.name).where(Client.id.in_(client_ids)))
+        titles.update({("client", ref_id): title for ref_id, title in rows.all()})
+    if invoice_ids:
+        rows = await db.execute(select(Invoice.id, Invoice.invoice_number).where(Invoice.id.in_(invoice_ids)))
+        titles.update({("invoice", ref_id): title for ref_id, title in rows.all()})
+    
+    return [
+        {"kind": kind, "id": ref_id, "title": titles.get((kind, ref_id), ""), "rank": rank}
+        for kind, ref_id, rank in hits
+    ]
@@ -0,0 +1,492 @@
+import asyncio
+import json
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import delete, update
+from sqlmodel import select
+
+from database import async_session
+from models import Job, JobStatus
+from core.config import settings
+from core.logging import get_logger
+from core.metrics import metrics, format_labels
+
+logger = get_logger(__name__)
+
+DEFAULT_PRIORITY = 5
+
+# How often a worker deletes expired job state, and how many rows per statement
+PURGE_INTERVAL_SECONDS = 600
+PURGE_BATCH_SIZE = 1000
+
+
+class DatabaseBroker:
+    """
+    Job queue stored in the application database; needs no external broker.
+
+    Workers claim a job with a guarded UPDATE, so several workers (or API
+    processes) can consume the same table. On Postgres the candidate row is
+    locked with SKIP LOCKED so concurrent claims pick different jobs. A
+    claimed job holds a lease (locked_until) that its worker renews; jobs
+    whose lease ran out are queued again by the next claim. Succeeded and
+    failed jobs are deleted by purge() TASK_RESULT_TTL_SECONDS after they
+    finished, like job state in Redis.
+    """
+
+    def __init__(self, lease: int, result_ttl: int):
+        self._lease = lease
+        self._result_ttl = result_ttl
+
+    async def enqueue(self, message: dict, run_after: datetime) -> None:
+        async with async_session() as db:
+            db.add(Job(
+                id=message["id"],
+                name=message["name"],
+                payload=json.dumps({"args": message["args"], "kwargs": message["kwargs"]}),
+                priority=message["priority"],
+                max_retries=message["max_retries"],
+                run_after=run_after,
+            ))
+            await db.commit()
+
+    async def _requeue_expired(self, db, now: datetime) -> None:
+        expired = await db.execute(
+            select(Job.id).where(Job.status == JobStatus.RUNNING, Job.locked_until < now).limit(100)
+        )
+        job_ids = expired.scalars().all()
+        if not job_ids:
+            return
+        requeued = await db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.status == JobStatus.RUNNING, Job.locked_until < now)
+            .values(status=JobStatus.QUEUED, locked_until=None, run_after=now, updated_at=now)
+            .returning(Job.id)
+        )
+        for job_id in requeued.scalars().all():
+            logger.warning("Task %s lost its worker, queued again", job_id)
+        await db.commit()
+
+    async def claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        async with async_session() as db:
+            await self._requeue_expired(db, now)
+            candidate = await db.execute(
+                select(Job.id)
+                .where(Job.status == JobStatus.QUEUED, Job.run_after <= now)
+                .order_by(Job.priority, Job.run_after)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job_id = candidate.scalar_one_or_none()
+            if job_id is None:
+                return None
+            claimed = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_until=now + timedelta(seconds=self._lease),
+                    updated_at=now,
+                )
+                .returning(Job.name, Job.payload, Job.priority, Job.attempts, Job.max_retries)
+            )
+            row = claimed.first()
+            await db.commit()
+        if row is None:
+            return None
+        payload = json.loads(row.payload)
+        return {
+            "id": job_id,
+            "name": row.name,
+            "args": payload["args"],
+            "kwargs": payload["kwargs"],
+            "priority": row.priority,
+            "attempts": row.attempts,
+            "max_retries": row.max_retries,
+        }
+
+    async def _set(self, task_id: str, **values) -> None:
+        async with async_session() as db:
+            await db.execute(
+                update(Job).where(Job.id == task_id).values(updated_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    async def extend(self, message: dict) -> None:
+        await self._set(message["id"], locked_until=datetime.utcnow() + timedelta(seconds=self._lease))
+
+    async def complete(self, message: dict) -> None:
+        await self._set(message["id"], status=JobStatus.SUCCEEDED, locked_until=None)
+
+    async def retry(self, message: dict, run_after: datetime, error: str) -> None:
+        await self._set(
+            message["id"], status=JobStatus.QUEUED, run_after=run_after, locked_until=None, last_error=error
+        )
+
+    async def requeue(self, message: dict) -> None:
+        # Interrupted, not failed: the attempt is given back
+        await self._set(
+            message["id"], status=JobStatus.QUEUED, run_after=datetime.utcnow(),
+            locked_until=None, attempts=Job.attempts - 1,
+        )
+
+    async def fail(self, message: dict, error: str) -> None:
+        await self._set(message["id"], status=JobStatus.FAILED, locked_until=None, last_error=error)
+
+    async def purge(self) -> int:
+        """Delete jobs that finished more than the result TTL ago; returns the rows deleted."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self._result_ttl)
+        deleted = 0
+        async with async_session() as db:
+            while True:
+                expired = (
+                    select(Job.id)
+                    .where(Job.status.in_((JobStatus.SUCCEEDED, JobStatus.FAILED)), Job.updated_at < cutoff)
+                    .limit(PURGE_BATCH_SIZE)
+                )
+                result = await db.execute(delete(Job).where(Job.id.in_(expired)))
+                await db.commit()
+                deleted += result.rowcount
+                if result.rowcount < PURGE_BATCH_SIZE:
+                    return deleted
+
+    async def status(self, task_id: str) -> Optional[str]:
+        async with async_session() as db:
+            result = await db.execute(select(Job.status).where(Job.id == task_id))
+            status = result.scalar_one_or_none()
+        return status.value if status is not None else None
+
+
+class RedisBroker:
+    """
+    Job queue in Redis, for fleets that already run it.
+
+    Ready jobs sit in a sorted set scored by (priority, enqueue time); delayed
+    jobs and retries wait in a second set scored by due time and are promoted
+    by whichever worker polls first. A claimed job is moved atomically into a
+    processing set scored by its lease expiry, renewed by the worker's
+    heartbeat; jobs whose lease ran out are put back in the ready set. Job
+    state is kept for TASK_RESULT_TTL_SECONDS.
+    """
+
+    # Pops the next ready job into the processing set in one step
+    CLAIM_SCRIPT = """
+    local popped = redis.call('ZPOPMIN', KEYS[1])
+    if #popped == 0 then
+        return nil
+    end
+    redis.call('ZADD', KEYS[2], ARGV[1], popped[1])
+    return popped[1]
+    """
+
+    def __init__(self, url: str, result_ttl: int, lease: int):
+        # Optional dependency, only needed when TASK_BROKER=redis
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._result_ttl = result_ttl
+        self._lease = lease
+        self._claim_script = self._redis.register_script(self.CLAIM_SCRIPT)
+
+    @staticmethod
+    def _job_key(task_id: str) -> str:
+        return f"tasks:job:{task_id}"
+
+    @staticmethod
+    def _score(message: dict) -> float:
+        # Priority dominates; enqueue time in ms keeps FIFO order within it
+        return message["priority"] * 1e13 + time.time() * 1000
+
+    async def _save(self, message: dict, ttl: Optional[int] = None) -> None:
+        await self._redis.set(self._job_key(message["id"]), json.dumps(message), ex=ttl)
+
+    async def enqueue(self, message: dict, run_after: datetime) -> None:
+        message = {**message, "status": JobStatus.QUEUED.value, "attempts": 0}
+        await self._save(message)
+        delay = (run_after - datetime.utcnow()).total_seconds()
+        if delay > 0:
+            await self._redis.zadd("tasks:delayed", {message["id"]: time.time() + delay})
+        else:
+            await self._redis.zadd("tasks:ready", {message["id"]: self._score(message)})
+
+    async def _promote(self, source: str) -> None:
+        """Move jobs of a set scored by time that are due back into the ready set."""
+        due = await self._redis.zrangebyscore(source, 0, time.time())
+        for task_id in due:
+            # Only the worker whose ZREM succeeds promotes the job
+            if await self._redis.zrem(source, task_id):
+                raw = await self._redis.get(self._job_key(task_id.decode()))
+                if raw is not None:
+                    await self._redis.zadd("tasks:ready", {task_id: self._score(json.loads(raw))})
+                    if source == "tasks:processing":
+                        logger.warning("Task %s lost its worker, queued again", task_id.decode())
+
+    async def claim(self) -> Optional[dict]:
+        await self._promote("tasks:delayed")
+        await self._promote("tasks:processing")
+
+        task_id = await self._claim_script(
+            keys=["tasks:ready", "tasks:processing"], args=[time.time() + self._lease]
+        )
+        if task_id is None:
+            return None
+        raw = await self._redis.get(self._job_key(task_id.decode()))
+        if raw is None:
+            await self._redis.zrem("tasks:processing", task_id)
+            return None
+        message = json.loads(raw)
+        message["status"] = JobStatus.RUNNING.value
+        message["attempts"] += 1
+        await self._save(message)
+        return message
+
+    async def extend(self, message: dict) -> None:
+        await self._redis.zadd("tasks:processing", {message["id"]: time.time() + self._lease}, xx=True)
+
+    async def complete(self, message: dict) -> None:
+        await self._save({**message, "status": JobStatus.SUCCEEDED.value}, self._result_ttl)
+        await self._redis.zrem("tasks:processing", message["id"])
+
+    async def retry(self, message: dict, run_after: datetime, error: str) -> None:
+        await self._save({**message, "status": JobStatus.QUEUED.value, "last_error": error})
+        due = time.time() + max((run_after - datetime.utcnow()).total_seconds(), 0)
+        await self._redis.zadd("tasks:delayed", {message["id"]: due})
+        await self._redis.zrem("tasks:processing", message["id"])
+
+    async def requeue(self, message: dict) -> None:
+        # Interrupted, not failed: the attempt is given back
+        message = {**message, "status": JobStatus.QUEUED.value, "attempts": message["attempts"] - 1}
+        await self._save(message)
+        await self._redis.zadd("tasks:ready", {message["id"]: self._score(message)})
+        await self._redis.zrem("tasks:processing", message["id"])
+
+    async def fail(self, message: dict, error: str) -> None:
+        await self._save({**message, "status": JobStatus.FAILED.value, "last_error": error}, self._result_ttl)
+        await self._redis.zrem("tasks:processing", message["id"])
+
+    async def purge(self) -> int:
+        # Job keys expire on their own
+        return 0
+
+    async def status(self, task_id: str) -> Optional[str]:
+        raw = await self._redis.get(self._job_key(task_id))
+        return json.loads(raw)["status"] if raw is not None else None
+
+
+class AsyncResult:
+    """Handle to an enqueued task, named after Celery's."""
+
+    def __init__(self, task_id: str, broker):
+        self.id = task_id
+        self._broker = broker
+
+    async def get_status(self) -> Optional[str]:
+        """queued, running, succeeded or failed; None once forgotten."""
+        return await self._broker.status(self.id)
+
+
+class Task:
+    """A registered task; `await task.delay(...)` enqueues it like Celery's delay()."""
+
+    def __init__(
+        self,
+        queue: "TaskQueue",
+        func: Callable,
+        name: str,
+        max_retries: int,
+        retry_backoff: float,
+        priority: int,
+        concurrency: Optional[int],
+    ):
+        self.queue = queue
+        self.func = func
+        self.name = name
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.priority = priority
+        self.limit = asyncio.Semaphore(concurrency) if concurrency else None
+
+    async def delay(self, *args, **kwargs) -> AsyncResult:
+        return await self.apply_async(args, kwargs)
+
+    async def apply_async(
+        self,
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        priority: Optional[int] = None,
+        countdown: Optional[float] = None,
+    ) -> AsyncResult:
+        """Enqueue the task; arguments must be JSON-serializable."""
+        return await self.queue.send_task(
+            self.name, args, kwargs,
+            priority=self.priority if priority is None else priority,
+            countdown=countdown,
+        )
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        """Run the task inline, bypassing the queue."""
+        if asyncio.iscoroutinefunction(self.func):
+            return await self.func(*args, **kwargs)
+        return await asyncio.to_thread(self.func, *args, **kwargs)
+
+
+class TaskQueue:
+    """
+    Registry of tasks plus the worker loop that runs them.
+
+    Failed tasks are retried with exponential backoff (retry_backoff * 2**n
+    seconds) up to max_retries times. A worker runs `concurrency` jobs at a
+    time; a task's own `concurrency` option caps how many of that task run at
+    once in one worker. While a job runs its lease is renewed every third of
+    `lease` seconds; a job interrupted by shutdown is queued again.
+    """
+
+    def __init__(self, broker, lease: int):
+        self.broker = broker
+        self.lease = lease
+        self.tasks: Dict[str, Task] = {}
+
+    def task(
+        self,
+        name: Optional[str] = None,
+        max_retries: int = 3,
+        retry_backoff: float = 2.0,
+        priority: int = DEFAULT_PRIORITY,
+        concurrency: Optional[int] = None,
+    ) -> Callable[[Callable], Task]:
+        def register(func: Callable) -> Task:
+            task = Task(
+                self, func, name or func.__name__,
+                max_retries, retry_backoff, priority, concurrency,
+            )
+            self.tasks[task.name] = task
+            return task
+        return register
+
+    async def send_task(
+        self,
+        name: str,
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        priority: int = DEFAULT_PRIORITY,
+        countdown: Optional[float] = None,
+    ) -> AsyncResult:
+        message = {
+            "id": uuid.uuid4().hex,
+            "name": name,
+            "args": list(args),
+            "kwargs": kwargs or {},
+            "priority": priority,
+            "max_retries": self.tasks[name].max_retries if name in self.tasks else 3,
+        }
+        run_after = datetime.utcnow() + timedelta(seconds=countdown or 0)
+        await self.broker.enqueue(message, run_after)
+        metrics.inc("tasks_enqueued_total", format_labels(task=name))
+        return AsyncResult(message["id"], self.broker)
+
+    async def _execute(self, message: dict) -> None:
+        task = self.tasks.get(message["name"])
+        labels = format_labels(task=message["name"])
+        if task is None:
+            logger.error("Unknown task %s (%s)", message["name"], message["id"])
+            await self.broker.fail(message, "Unknown task")
+            return
+        # Claimed again after each lease that ran out, e.g. a job that kills its worker
+        if message["attempts"] > message["max_retries"] + 1:
+            logger.error("Task %s (%s) lost its worker too many times", task.name, message["id"])
+            await self.broker.fail(message, "Lease expired too many times")
+            metrics.inc("tasks_failed_total", labels)
+            return
+
+        start = time.perf_counter()
+        heartbeat = asyncio.create_task(self._heartbeat(message))
+        try:
+            if task.limit is not None:
+                async with task.limit:
+                    await task(*message["args"], **message["kwargs"])
+            else:
+                await task(*message["args"], **message["kwargs"])
+        except asyncio.CancelledError:
+            logger.warning("Task %s (%s) interrupted, queued again", task.name, message["id"])
+            await asyncio.shield(self.broker.requeue(message))
+            raise
+        except Exception as exc:
+            error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+            if message["attempts"] <= message["max_retries"]:
+                delay = task.retry_backoff * 2 ** (message["attempts"] - 1)
+                logger.warning(
+                    "Task %s (%s) failed, retrying in %.1fs: %s",
+                    task.name, message["id"], delay, error,
+                )
+                await self.broker.retry(message, datetime.utcnow() + timedelta(seconds=delay), error)
+                metrics.inc("tasks_retried_total", labels)
+            else:
+                logger.exception("Task %s (%s) failed permanently", task.name, message["id"])
+                await self.broker.fail(message, error)
+                metrics.inc("tasks_failed_total", labels)
+        else:
+            await self.broker.complete(message)
+            metrics.inc("tasks_succeeded_total", labels)
+        finally:
+            heartbeat.cancel()
+            metrics.observe("task_duration_seconds", labels, time.perf_counter() - start)
+
+    async def _heartbeat(self, message: dict) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await self.broker.extend(message)
+            except Exception:
+                logger.exception("Renewing the lease of task %s failed", message["id"])
+
+    async def _purge(self) -> None:
+        while True:
+            try:
+                deleted = await self.broker.purge()
+                if deleted:
+                    logger.info("Deleted %d finished jobs", deleted)
+            except Exception:
+                logger.exception("Deleting finished jobs failed")
+            await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+
+    async def _consume(self, poll_interval: float) -> None:
+        while True:
+            try:
+                message = await self.broker.claim()
+            except Exception:
+                logger.exception("Claiming a task failed")
+                message = None
+            if message is None:
+                await asyncio.sleep(poll_interval)
+                continue
+            try:
+                await self._execute(message)
+            except Exception:
+                logger.exception("Recording the outcome of task %s failed", message["id"])
+
+    async def run_worker(self, concurrency: Optional[int] = None, poll_interval: Optional[float] = None) -> None:
+        """Consume jobs forever with `concurrency` parallel consumers."""
+        concurrency = concurrency or settings.TASK_CONCURRENCY
+        poll_interval = poll_interval or settings.TASK_POLL_INTERVAL
+        logger.info("Task worker started with concurrency %d", concurrency)
+        # Not gathered with the consumers: a cancelled purge would end the
+        # gather before interrupted jobs are queued again
+        purge = asyncio.create_task(self._purge())
+        try:
+            await asyncio.gather(*(self._consume(poll_interval) for _ in range(concurrency)))
+        finally:
+            purge.cancel()
+
+
+def create_broker():
+    """Create the broker selected by TASK_BROKER."""
+    if settings.TASK_BROKER == "redis":
+        return RedisBroker(settings.REDIS_URL, settings.TASK_RESULT_TTL_SECONDS, settings.TASK_LEASE_SECONDS)
+    return DatabaseBroker(settings.TASK_LEASE_SECONDS, settings.TASK_RESULT_TTL_SECONDS)
+
+
+task_queue = TaskQueue(create_broker(), settings.TASK_LEASE_SECONDS)
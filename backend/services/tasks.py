@@ -0,0 +1,94 @@
+import asyncio
+import sys
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+
+from database import async_session, init_db
+from models import Invoice, Client, User
+from core.config import settings
+from core.logging import get_logger
+from services.invoice_pdf import render_invoice_html, get_invoice_pdf
+from services.invoice_balance import reconcile_invoice_balances
+from services.invoice_summary import rebuild_invoice_summaries
+from services.task_queue import task_queue
+
+logger = get_logger(__name__)
+
+
+async def _load_invoice_document(invoice_id: int):
+    """Load an invoice with its client and owner and render its HTML."""
+    async with async_session() as db:
+        result = await db.execute(
+            select(Invoice).where(Invoice.id == invoice_id).options(selectinload(Invoice.items))
+        )
+        invoice = result.scalar_one_or_none()
+        if invoice is None:
+            return None, None, None
+        client = await db.get(Client, invoice.client_id)
+        user = await db.get(User, invoice.user_id)
+    return invoice, client, render_invoice_html(invoice, invoice.items, client, user)
+
+
+# Low priority: only warms the PDF cache ahead of a download
+@task_queue.task(priority=8)
+async def render_invoice_pdf(invoice_id: int) -> None:
+    invoice, _, html = await _load_invoice_document(invoice_id)
+    if invoice is not None:
+        await get_invoice_pdf(html)
+
+
+# Caps parallel SMTP connections per worker
+@task_queue.task(max_retries=5, retry_backoff=30.0, priority=3, concurrency=2)
+async def send_invoice_email(invoice_id: int) -> None:
+    invoice, client, html = await _load_invoice_document(invoice_id)
+    if invoice is None:
+        logger.warning("Not emailing invoice %d: it no longer exists", invoice_id)
+        return
+    if not settings.SMTP_HOST:
+        logger.warning("Not emailing invoice %d: SMTP_HOST is not configured", invoice_id)
+        return
+    pdf_path = await get_invoice_pdf(html)
+    await asyncio.to_thread(_send_email, client.email, invoice.invoice_number, html, pdf_path.read_bytes())
+    logger.info("Emailed invoice %d to %s", invoice_id, client.email)
+
+
+def _send_email(to: str, invoice_number: str, html: str, pdf: bytes) -> None:
+    import emails
+
+    message = emails.html(
+        html=html,
+        subject=f"Invoice {invoice_number}",
+        mail_from=settings.EMAILS_FROM,
+    )
+    message.attach(data=pdf, filename=f"{invoice_number}.pdf")
+    response = message.send(to=to, smtp={
+        "host": settings.SMTP_HOST,
+        "port": settings.SMTP_PORT,
+        "user": settings.SMTP_USER or None,
+        "password": settings.SMTP_PASSWORD or None,
+        "tls": settings.SMTP_TLS,
+    })
+    if response.status_code not in (250, 251):
+        raise RuntimeError(f"SMTP send failed with status {response.status_code}")
+
+
+@task_queue.task(priority=9, concurrency=1)
+async def rebuild_invoice_reports() -> None:
+    """Reconcile invoice balances with payments, then rebuild the invoice summaries."""
+    await reconcile_invoice_balances(fix=True)
+    async with async_session() as db:
+        await rebuild_invoice_summaries(db)
+
+
+if __name__ == "__main__":
+    # Standalone worker: python -m services.tasks
+    # Enqueue a task by name: python -m services.tasks rebuild_invoice_reports
+    async def main():
+        await init_db()
+        if len(sys.argv) > 1:
+            result = await task_queue.tasks[sys.argv[1]].delay()
+            print(result.id)
+        else:
+            await task_queue.run_worker()
+
+    asyncio.run(main())